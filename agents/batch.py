@@ -0,0 +1,152 @@
+"""Bulk multi-ticker analysis via the Anthropic Message Batches API.
+
+Watchlist scans analyse many tickers at once and are not latency-sensitive,
+so the analyst stage is submitted as **one** Message Batch (half the price of
+N interactive calls).  The other stages still run per ticker:
+
+  1. researcher  – every ticker concurrently (same fetch nodes as the graph)
+  2. analyst     – TA tools per ticker, then a single batch for all prompts
+  3. strategist  – every ticker concurrently (interactive API)
+  4. persist     – all theses in a single bulk insert
+
+The single-ticker ``/analyze/{ticker}`` path keeps the interactive API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from anthropic import AsyncAnthropic
+
+from config import settings
+from database import crud
+from models.state import AgentState, AnalystOutput
+from prompts.system_prompts import ANALYST_PROMPT
+from agents.graph import make_initial_state
+from agents.tools import EMIT_ANALYSIS_TOOL
+from agents.nodes import (
+    researcher_node,
+    strategist_node,
+    _run_ta_tools,
+    _build_signal_prompt,
+    _analyst_result_from_dict,
+    _inject_tool_results,
+    _empty_analyst_result,
+)
+
+logger = logging.getLogger(__name__)
+
+# Batches usually finish within minutes; poll gently
+_POLL_INTERVAL_S = 30
+# ...but may take up to 24 h – past this the batch is cancelled
+_MAX_WAIT_S = 60 * 60
+
+# Forced tool-use: Claude answers with validated JSON, no fences or prose
+_EMIT_ANALYSIS_SPEC = {
+    "name": EMIT_ANALYSIS_TOOL,
+    "description": "Trả về kết quả phân tích cuối cùng (FA, TA, SMC, Elliott, Wyckoff).",
+    "input_schema": AnalystOutput.model_json_schema(),
+}
+
+
+async def run_batch_analysis(tickers: list[str]) -> list[AgentState]:
+    """Run the full pipeline for many tickers, batching the analyst LLM calls.
+
+    Returns the final AgentState of every (de-duplicated) ticker, in order.
+    """
+    symbols = list(dict.fromkeys(t.upper() for t in tickers))
+    logger.info("🚀 Starting batch analysis for %d tickers", len(symbols))
+
+    states = [make_initial_state(symbol) for symbol in symbols]
+
+    # ── 1. Research (all tickers in parallel) ────────────────────────────
+    for state, update in zip(states, await asyncio.gather(*(researcher_node(s) for s in states))):
+        state.update(update)
+
+    # ── 2. Analyst: tools per ticker, one Message Batch for the LLM ──────
+    tool_results = await asyncio.gather(*(_run_ta_tools(s["ticker"]) for s in states))
+    prompts = {
+        state["ticker"]: _build_signal_prompt(state, *tools)
+        for state, tools in zip(states, tool_results)
+    }
+
+    try:
+        analyses = await _run_message_batch(prompts)
+    except Exception as exc:
+        logger.exception("Analyst batch failed: %s", exc)
+        analyses = {}
+
+    for state, tools in zip(states, tool_results):
+        analysis = analyses.get(state["ticker"])
+        result = _analyst_result_from_dict(analysis) if analysis else _empty_analyst_result()
+        state.update(_inject_tool_results(result, *tools))
+
+    # ── 3. Strategist (all tickers in parallel) ──────────────────────────
+    for state, update in zip(states, await asyncio.gather(*(strategist_node(s) for s in states))):
+        state.update(update)
+
+    # ── 4. Persist every thesis in one request ───────────────────────────
+    theses = [row for state in states for row in state.get("pending_db_writes", [])]
+    try:
+        await asyncio.to_thread(crud.upsert_theses_bulk, theses)
+    except Exception:
+        logger.warning("Could not save %d theses to DB (DB might not be configured)", len(theses))
+
+    logger.info("✅ Batch analysis completed for %d tickers", len(symbols))
+    return states
+
+
+async def _run_message_batch(prompts: dict[str, str]) -> dict[str, dict]:
+    """Submit one analyst request per ticker and wait for the batch to end.
+
+    Returns ``{ticker: emit_analysis input}`` for every request that
+    succeeded; empty if the batch is still running after ``_MAX_WAIT_S``
+    (it is cancelled then).
+    """
+    requests: list[dict[str, Any]] = [
+        {
+            "custom_id": ticker,
+            "params": {
+                "model": settings.anthropic_model,
+                "max_tokens": 4096,
+                "temperature": 0.3,
+                "system": [
+                    {"type": "text", "text": ANALYST_PROMPT, "cache_control": {"type": "ephemeral"}},
+                ],
+                "messages": [{"role": "user", "content": prompt}],
+                "tools": [_EMIT_ANALYSIS_SPEC],
+                "tool_choice": {"type": "tool", "name": EMIT_ANALYSIS_TOOL},
+            },
+        }
+        for ticker, prompt in prompts.items()
+    ]
+
+    async with AsyncAnthropic(api_key=settings.anthropic_api_key) as client:
+        batch = await client.messages.batches.create(requests=requests)
+        logger.info("📦 Submitted analyst batch %s (%d requests)", batch.id, len(requests))
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + _MAX_WAIT_S
+        while batch.processing_status != "ended":
+            if loop.time() >= deadline:
+                logger.error(
+                    "Analyst batch %s still %s after %d s – cancelling",
+                    batch.id, batch.processing_status, _MAX_WAIT_S,
+                )
+                await client.messages.batches.cancel(batch.id)
+                return {}
+            await asyncio.sleep(_POLL_INTERVAL_S)
+            batch = await client.messages.batches.retrieve(batch.id)
+
+        analyses: dict[str, dict] = {}
+        async for entry in await client.messages.batches.results(batch.id):
+            if entry.result.type != "succeeded":
+                logger.warning("Batch request for %s %s", entry.custom_id, entry.result.type)
+                continue
+            for block in entry.result.message.content:
+                if block.type == "tool_use" and block.name == EMIT_ANALYSIS_TOOL:
+                    analyses[entry.custom_id] = block.input
+                    break
+    return analyses
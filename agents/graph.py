@@ -1,36 +1,82 @@
-"""LangGraph state machine – wires researcher → analyst → strategist."""
+"""LangGraph state machine – wires researcher → analyst → strategist.
+
+The researcher stage is a fan-out: ``START`` dispatches one ``Send`` per
+data source, the ``fetch_*`` branches run in parallel, and ``join_research``
+waits for all of them before the analyst runs.
+
+Persisting the thesis is the caller's job (``pending_db_writes``).  The
+LangGraph server has no caller of ours, so ``langgraph.json`` points at
+``build_studio_graph``, which ends with a ``persist`` node instead.
+"""
 
 from __future__ import annotations
 
+import asyncio
 import logging
 
 from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
 
+from database import crud
 from models.state import AgentState
-from agents.nodes import researcher_node, analyst_node, strategist_node
+from agents.nodes import RESEARCH_NODES, join_research_node, analyst_node, strategist_node
 
 logger = logging.getLogger(__name__)
 
 
-def build_graph() -> StateGraph:
-    """Build and return the compiled analysis graph."""
+def _dispatch_research(state: AgentState) -> list[Send]:
+    """Fan the initial state out to every data-gathering node."""
+    return [Send(name, state) for name in RESEARCH_NODES]
+
+
+async def persist_node(state: AgentState) -> dict:
+    """Save the stock and the strategist's theses (best-effort)."""
+    ticker = state["ticker"]
+    try:
+        await asyncio.to_thread(crud.upsert_stock, symbol=ticker)
+        for thesis in state.get("pending_db_writes", []):
+            await asyncio.to_thread(crud.upsert_thesis, **thesis)
+    except Exception:
+        logger.warning("Could not save analysis for %s (DB might not be configured)", ticker)
+    return {}
+
+
+def build_graph(persist: bool = False) -> StateGraph:
+    """Build and return the compiled analysis graph.
+
+    With ``persist=True`` the graph writes ``pending_db_writes`` itself;
+    the app leaves it off and saves them after responding.
+    """
 
     graph = StateGraph(AgentState)
 
     # Add nodes
-    graph.add_node("researcher", researcher_node)
+    for name, node in RESEARCH_NODES.items():
+        graph.add_node(name, node)
+    graph.add_node("join_research", join_research_node)
     graph.add_node("analyst", analyst_node)
     graph.add_node("strategist", strategist_node)
 
-    # Wire edges: START → researcher → analyst → strategist → END
-    graph.add_edge(START, "researcher")
-    graph.add_edge("researcher", "analyst")
+    # Wire edges: START ⇉ fetch_* ⇉ join_research → analyst → strategist → END
+    graph.add_conditional_edges(START, _dispatch_research, list(RESEARCH_NODES))
+    graph.add_edge(list(RESEARCH_NODES), "join_research")
+    graph.add_edge("join_research", "analyst")
     graph.add_edge("analyst", "strategist")
-    graph.add_edge("strategist", END)
+    if persist:
+        graph.add_node("persist", persist_node)
+        graph.add_edge("strategist", "persist")
+        graph.add_edge("persist", END)
+    else:
+        graph.add_edge("strategist", END)
 
     return graph.compile()
 
 
+def build_studio_graph() -> StateGraph:
+    """Graph served by ``langgraph.json`` – persists its own results."""
+    return build_graph(persist=True)
+
+
 # Pre-compiled graph singleton
 _compiled_graph = None
 
@@ -42,21 +88,9 @@ def _get_graph():
     return _compiled_graph
 
 
-def run_analysis(ticker: str, mode: str = "agent_mode") -> AgentState:
-    """Run the full analysis pipeline for a given ticker.
-
-    Parameters
-    ----------
-    mode : str
-        ``"agent_mode"`` (Claude) or ``"signal_mode"`` (DeepSeek R1).
-
-    Returns the final AgentState with all analysis results.
-    """
-    logger.info("🚀 Starting analysis pipeline for %s [%s]", ticker, mode)
-
-    graph = _get_graph()
-
-    initial_state: AgentState = {
+def make_initial_state(ticker: str, mode: str = "agent_mode") -> AgentState:
+    """Return a fresh AgentState for ``ticker`` with every field defaulted."""
+    return {
         "ticker": ticker.upper(),
         "mode": mode,
         "current_price": 0.0,
@@ -73,8 +107,36 @@ def run_analysis(ticker: str, mode: str = "agent_mode") -> AgentState:
         "current_strategy": None,
         "daily_delta_note": None,
         "final_message": "",
+        "pending_db_writes": [],
     }
 
-    result = graph.invoke(initial_state)
+
+async def run_analysis(
+    ticker: str,
+    mode: str = "agent_mode",
+    report_queue: asyncio.Queue | None = None,
+) -> AgentState:
+    """Run the full analysis pipeline for a given ticker.
+
+    Parameters
+    ----------
+    mode : str
+        ``"agent_mode"`` (Claude) or ``"signal_mode"`` (DeepSeek R1).
+    report_queue : asyncio.Queue, optional
+        If given, the strategist streams the report into it as it is
+        generated (``None`` marks the end).
+
+    Returns the final AgentState with all analysis results.  Nothing is
+    written to the DB here: the thesis rows are returned in
+    ``pending_db_writes`` for the caller to persist.
+    """
+    logger.info("🚀 Starting analysis pipeline for %s [%s]", ticker, mode)
+
+    graph = _get_graph()
+
+    initial_state = make_initial_state(ticker, mode)
+
+    config = {"configurable": {"report_queue": report_queue}} if report_queue is not None else None
+    result = await graph.ainvoke(initial_state, config=config)
     logger.info("✅ Analysis pipeline completed for %s", ticker)
     return result
@@ -1,34 +1,51 @@
 """LangGraph node functions for the stock analysis pipeline.
 
-Three nodes:
-  1. researcher_node  – fetches raw data from vnstock + news
+Three stages:
+  1. researcher       – fetch_* nodes gather raw data from vnstock, news & DB
   2. analyst_node     – ReAct agent with SMC/Elliott/Wyckoff tools + structured analysis
   3. strategist_node  – produces final strategy & Telegram-ready message
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import re
+import threading
+import weakref
 from typing import Any
 
+import orjson
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.prebuilt import create_react_agent
+from pydantic import BaseModel, ValidationError
 
-from config import get_settings
+from config import settings
 from models.state import AgentState, FinancialAnalysis, TechnicalSignals, InvestmentStrategy, ScenarioDetail
-from services import vnstock_service, news_service
+from services import news_service
+from services.data_source import get_data_service
 from database import crud
 from prompts.system_prompts import ANALYSIS_SYSTEM_PROMPT, ANALYST_PROMPT
-from agents.tools import ANALYST_TOOLS
+from agents.tools import ANALYST_TOOLS, EMIT_ANALYSIS_TOOL, emit_analysis
 
 logger = logging.getLogger(__name__)
 
+# Fenced blocks in an LLM answer: a ```json one wins, else the first of any
+# language (or none)
+_JSON_BLOCK_RE = re.compile(r"```json\b\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+_CODE_BLOCK_RE = re.compile(r"```(?:[\w-]+)?\s*(.*?)```", re.DOTALL)
+
 
 def _safe_json_dumps(obj: Any) -> str:
-    """JSON serialize with full safety for pandas/numpy types."""
-    return json.dumps(_sanitize(obj), default=str, ensure_ascii=False, indent=2)
+    """JSON serialize with full safety for pandas/numpy types.
+
+    Compact (no indent) – the output goes into LLM prompts, where whitespace
+    only costs tokens.
+    """
+    return orjson.dumps(_sanitize(obj), default=str).decode()
 
 
 def _sanitize(obj: Any) -> Any:
@@ -81,10 +98,6 @@ def _sanitize(obj: Any) -> Any:
     return obj
 
 
-# Keep backward compat alias
-_sanitize_keys = _sanitize
-
-
 def _g(obj: Any, key: str, default: Any = None) -> Any:
     """Get a value from a dict or object attribute — works with both."""
     if isinstance(obj, dict):
@@ -92,14 +105,33 @@ def _g(obj: Any, key: str, default: Any = None) -> Any:
     return getattr(obj, key, default)
 
 
+# LLM clients per event loop: their async HTTP pool is bound to the loop it
+# first ran on, and the backtest drives the nodes on a loop of its own
+_llms: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, Any]] = (
+    weakref.WeakKeyDictionary()
+)
+_llms_lock = threading.Lock()
+
+
 def _get_llm(mode: str = "agent_mode"):
-    """Return a configured LLM instance based on mode.
+    """Return the running loop's cached LLM instance for ``mode``.
 
     agent_mode  → Claude (Anthropic)
     signal_mode → DeepSeek R1 (OpenAI-compatible)
+
+    One client per mode is shared by every node call on a loop, so the
+    underlying HTTP connection pool survives between the analyst and
+    strategist.
     """
-    settings = get_settings()
+    loop = asyncio.get_running_loop()
+    with _llms_lock:
+        per_mode = _llms.setdefault(loop, {})
+        if mode not in per_mode:
+            per_mode[mode] = _new_llm(mode)
+        return per_mode[mode]
+
 
+def _new_llm(mode: str):
     if mode == "signal_mode":
         from langchain_openai import ChatOpenAI
         return ChatOpenAI(
@@ -115,46 +147,88 @@ def _get_llm(mode: str = "agent_mode"):
             api_key=settings.anthropic_api_key,
             max_tokens=4096,
             temperature=0.3,
+            default_headers={"anthropic-beta": "prompt-caching-2024-07-31"},
         )
 
 
+def _system_message(prompt: str, mode: str = "agent_mode") -> SystemMessage:
+    """Build the system message for ``mode``.
+
+    For Claude the (static, large) system prompt is marked as an ephemeral
+    prompt-cache breakpoint so repeat calls only pay cache-read tokens.
+    DeepSeek's OpenAI-compatible API gets the plain string.
+    """
+    if mode == "signal_mode":
+        return SystemMessage(content=prompt)
+    return SystemMessage(content=[
+        {"type": "text", "text": prompt, "cache_control": {"type": "ephemeral"}},
+    ])
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # NODE 1: Researcher — gather raw data
+#
+# The four sources are independent I/O calls, so each is its own node and
+# the graph fans them out in parallel (see ``agents/graph.py``).  Every node
+# writes a disjoint slice of the state and handles its own failures.
 # ─────────────────────────────────────────────────────────────────────────────
 
 
-def researcher_node(state: AgentState) -> dict[str, Any]:
-    """Fetch financial ratios, price history, and news for the ticker."""
-
+async def fetch_financials_node(state: AgentState) -> dict[str, Any]:
+    """Fetch quarterly financial ratios & growth for the ticker."""
     ticker = state["ticker"]
-    logger.info("🔍 Researcher: fetching data for %s", ticker)
+    try:
+        raw_financials = await asyncio.to_thread(get_data_service().get_financial_ratios, ticker)
+    except Exception as exc:
+        logger.warning("Financial ratios failed for %s: %s", ticker, exc)
+        raw_financials = {"error": str(exc)}
+    return _sanitize({"raw_financials": raw_financials})
+
 
-    # Financial data
-    raw_financials = vnstock_service.get_financial_ratios(ticker)
+async def fetch_ohlc_node(state: AgentState) -> dict[str, Any]:
+    """Fetch 365 days of OHLCV and compute the classic indicators."""
+    ticker = state["ticker"]
+    try:
+        price_df = await asyncio.to_thread(get_data_service().get_price_history, ticker, days=365)
+    except Exception as exc:
+        logger.warning("Price history failed for %s: %s", ticker, exc)
+        price_df = {"error": str(exc)}
 
-    # Price data (OHLCV)
-    price_df = vnstock_service.get_price_history(ticker, days=365)
     if isinstance(price_df, dict):
         raw_ohlc = price_df  # error dict
         current_price = 0.0
     else:
         # Calculate technical indicators
-        tech = vnstock_service.calculate_technical_indicators(price_df)
+        tech = get_data_service().calculate_technical_indicators(price_df)
         raw_ohlc = {
-            "latest_data": price_df.tail(5).to_dict(orient="records"),
+            # to_json is C-coded (no per-cell numpy boxing); NaN → null, dates → ISO
+            "latest_data": orjson.loads(price_df.tail(5).to_json(orient="records", date_format="iso")),
             "technical": tech,
             "total_rows": len(price_df),
         }
         current_price = tech.get("latest_close", 0.0)
 
-    # News
-    raw_news = news_service.search_news_sync(ticker, limit=5)
+    return _sanitize({"raw_ohlc": raw_ohlc, "current_price": current_price})
+
+
+async def fetch_news_node(state: AgentState) -> dict[str, Any]:
+    """Fetch recent news headlines for the ticker."""
+    ticker = state["ticker"]
+    try:
+        raw_news = await news_service.search_news(ticker, limit=5)
+    except Exception as exc:
+        logger.warning("News search failed for %s: %s", ticker, exc)
+        raw_news = [f"Không tìm thấy tin tức mới cho {ticker}."]
+    return {"raw_news": raw_news}
+
 
-    # Previous thesis & scenarios from DB (for comparison)
+async def fetch_prev_thesis_node(state: AgentState) -> dict[str, Any]:
+    """Load the previous thesis & scenarios from DB (for comparison)."""
+    ticker = state["ticker"]
     previous_thesis = None
     previous_scenarios = None
     try:
-        thesis = crud.get_latest_thesis(ticker)
+        thesis = await asyncio.to_thread(crud.get_latest_thesis, ticker)
         if thesis:
             previous_thesis = thesis.get("thesis_content", "")
             # Parse scenarios from DB
@@ -166,22 +240,45 @@ def researcher_node(state: AgentState) -> dict[str, Any]:
     except Exception:
         logger.warning("Could not fetch previous thesis from DB")
 
-    return _sanitize_keys({
-        "current_price": current_price,
-        "raw_financials": raw_financials,
-        "raw_ohlc": raw_ohlc,
-        "raw_news": raw_news,
+    return _sanitize({
         "previous_thesis": previous_thesis,
         "previous_scenarios": previous_scenarios,
     })
 
 
+RESEARCH_NODES = {
+    "fetch_financials": fetch_financials_node,
+    "fetch_ohlc": fetch_ohlc_node,
+    "fetch_news": fetch_news_node,
+    "fetch_prev_thesis": fetch_prev_thesis_node,
+}
+
+
+async def join_research_node(state: AgentState) -> dict[str, Any]:
+    """Synchronisation point — every fetch branch has merged into the state."""
+    logger.info("🔍 Researcher: data ready for %s", state["ticker"])
+    return {}
+
+
+async def researcher_node(state: AgentState) -> dict[str, Any]:
+    """Run every research fetch concurrently and merge their updates.
+
+    Used outside the graph (e.g. backtesting) where there is no fan-out.
+    """
+    logger.info("🔍 Researcher: fetching data for %s", state["ticker"])
+    updates = await asyncio.gather(*(node(state) for node in RESEARCH_NODES.values()))
+    merged: dict[str, Any] = {}
+    for update in updates:
+        merged.update(update)
+    return merged
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # NODE 2: Analyst — ReAct agent with SMC/Elliott/Wyckoff tools
 # ─────────────────────────────────────────────────────────────────────────────
 
 
-def analyst_node(state: AgentState) -> dict[str, Any]:
+async def analyst_node(state: AgentState) -> dict[str, Any]:
     """Run analysis with mode-appropriate strategy.
 
     agent_mode  → ReAct agent with tools (Claude)
@@ -192,12 +289,12 @@ def analyst_node(state: AgentState) -> dict[str, Any]:
     logger.info("📊 Analyst: analysing %s [%s]", ticker, mode)
 
     if mode == "signal_mode":
-        return _analyst_signal_mode(state)
+        return await _analyst_signal_mode(state)
     else:
-        return _analyst_agent_mode(state)
+        return await _analyst_agent_mode(state)
 
 
-def _analyst_agent_mode(state: AgentState) -> dict[str, Any]:
+async def _analyst_agent_mode(state: AgentState) -> dict[str, Any]:
     """ReAct agent with SMC/Elliott/Wyckoff tools — for Claude."""
     ticker = state["ticker"]
     llm = _get_llm("agent_mode")
@@ -208,19 +305,29 @@ def _analyst_agent_mode(state: AgentState) -> dict[str, Any]:
         f"### Price & Technical Data\n```json\n{_safe_json_dumps(state['raw_ohlc'])}\n```\n\n"
         f"### Tin tức gần đây\n" + "\n".join(f"- {n}" for n in state.get("raw_news", []))
         + f"\n\n**Mã chứng khoán cần phân tích: {ticker}**"
+        + f"\n\nKhi đã có đủ kết quả, gọi tool `{EMIT_ANALYSIS_TOOL}` với kết quả cuối cùng "
+        + "(không trả lời JSON dạng text)."
     )
 
     try:
+        # emit_analysis is return_direct – calling it ends the ReAct loop
         react_agent = create_react_agent(
             model=llm,
-            tools=ANALYST_TOOLS,
-            prompt=ANALYST_PROMPT,
+            tools=[*ANALYST_TOOLS, emit_analysis],
+            prompt=_system_message(ANALYST_PROMPT),
         )
 
-        agent_result = react_agent.invoke(
+        agent_result = await react_agent.ainvoke(
             {"messages": [HumanMessage(content=data_context)]}
         )
 
+        # Structured result: the arguments of the emit_analysis call
+        for msg in reversed(agent_result["messages"]):
+            for call in getattr(msg, "tool_calls", None) or []:
+                if call["name"] == EMIT_ANALYSIS_TOOL:
+                    return _analyst_result_from_dict(call["args"])
+
+        # Fallback: the model answered in text
         final_msg = agent_result["messages"][-1]
         content = final_msg.content if hasattr(final_msg, "content") else str(final_msg)
         return _parse_analyst_response(content, ticker)
@@ -230,42 +337,38 @@ def _analyst_agent_mode(state: AgentState) -> dict[str, Any]:
         return _empty_analyst_result()
 
 
-def _analyst_signal_mode(state: AgentState) -> dict[str, Any]:
-    """Direct tool execution + single LLM call — for DeepSeek R1.
+async def _run_ta_tools(ticker: str) -> tuple[dict, dict, dict]:
+    """Run the SMC, Elliott and Wyckoff tools concurrently.
 
-    1. Call SMC, Elliott, Wyckoff tools directly (as Python functions)
-    2. Combine all results into a single prompt
-    3. Send to DeepSeek R1 (no tool calling, no ReAct)
+    Returns their results in that order; a failed tool yields an error dict.
     """
-    ticker = state["ticker"]
-    llm = _get_llm("signal_mode")
-
-    # ── 1. Run tools directly ────────────────────────────────────────────
     from agents.tools import get_smc_structures, analyze_elliott_waves, analyze_wyckoff
 
-    smc_result = {}
-    try:
-        smc_result = get_smc_structures.invoke({"ticker": ticker, "lookback": 100})
-    except Exception as exc:
-        logger.warning("SMC tool failed: %s", exc)
-        smc_result = {"error": str(exc)}
+    calls = [
+        ("SMC", get_smc_structures, {"ticker": ticker, "lookback": 100}),
+        ("Elliott", analyze_elliott_waves, {"ticker": ticker, "zigzag_pct": 0.05}),
+        ("Wyckoff", analyze_wyckoff, {"ticker": ticker, "lookback": 200}),
+    ]
+    results = await asyncio.gather(
+        *(tool.ainvoke(args) for _, tool, args in calls),
+        return_exceptions=True,
+    )
 
-    elliott_result = {}
-    try:
-        elliott_result = analyze_elliott_waves.invoke({"ticker": ticker, "zigzag_pct": 0.05})
-    except Exception as exc:
-        logger.warning("Elliott tool failed: %s", exc)
-        elliott_result = {"error": str(exc)}
+    out = []
+    for (name, _, _), res in zip(calls, results):
+        if isinstance(res, Exception):
+            logger.warning("%s tool failed: %s", name, res)
+            res = {"error": str(res)}
+        out.append(res)
+    return out[0], out[1], out[2]
 
-    wyckoff_result = {}
-    try:
-        wyckoff_result = analyze_wyckoff.invoke({"ticker": ticker, "lookback": 200})
-    except Exception as exc:
-        logger.warning("Wyckoff tool failed: %s", exc)
-        wyckoff_result = {"error": str(exc)}
 
-    # ── 2. Build single prompt with all data ─────────────────────────────
-    prompt = (
+def _build_signal_prompt(
+    state: AgentState, smc_result: dict, elliott_result: dict, wyckoff_result: dict
+) -> str:
+    """Single analyst prompt embedding raw data + pre-computed TA tool results."""
+    ticker = state["ticker"]
+    return (
         f"## Dữ liệu tài chính cho {ticker}\n\n"
         f"### Financial Ratios\n```json\n{_safe_json_dumps(state['raw_financials'])}\n```\n\n"
         f"### Price & Technical Data\n```json\n{_safe_json_dumps(state['raw_ohlc'])}\n```\n\n"
@@ -285,25 +388,36 @@ def _analyst_signal_mode(state: AgentState) -> dict[str, Any]:
         + '}\n```'
     )
 
+
+async def _analyst_signal_mode(state: AgentState) -> dict[str, Any]:
+    """Direct tool execution + single LLM call — for DeepSeek R1.
+
+    1. Call SMC, Elliott, Wyckoff tools directly (as Python functions)
+    2. Combine all results into a single prompt
+    3. Send to DeepSeek R1 (no tool calling, no ReAct)
+    """
+    ticker = state["ticker"]
+    llm = _get_llm("signal_mode")
+
+    # ── 1. Run tools directly (concurrently) ─────────────────────────────
+    smc_result, elliott_result, wyckoff_result = await _run_ta_tools(ticker)
+
+    # ── 2. Build single prompt with all data ─────────────────────────────
+    prompt = _build_signal_prompt(state, smc_result, elliott_result, wyckoff_result)
+
     try:
         # ── 3. Single LLM invoke (no tools, no ReAct) ───────────────────
-        response = llm.invoke([
-            SystemMessage(content=ANALYST_PROMPT if isinstance(ANALYST_PROMPT, str) else "Bạn là chuyên gia phân tích kỹ thuật chứng khoán Việt Nam."),
+        response = await llm.ainvoke([
+            _system_message(
+                ANALYST_PROMPT if isinstance(ANALYST_PROMPT, str) else "Bạn là chuyên gia phân tích kỹ thuật chứng khoán Việt Nam.",
+                "signal_mode",
+            ),
             HumanMessage(content=prompt),
         ])
         content = response.content if hasattr(response, "content") else str(response)
 
         result = _parse_analyst_response(content, ticker)
-
-        # Inject the raw tool results (they won't be lost)
-        if result.get("smc_analysis") is None:
-            result["smc_analysis"] = smc_result
-        if result.get("elliott_analysis") is None:
-            result["elliott_analysis"] = elliott_result
-        if result.get("wyckoff_analysis") is None:
-            result["wyckoff_analysis"] = wyckoff_result
-
-        return result
+        return _inject_tool_results(result, smc_result, elliott_result, wyckoff_result)
 
     except Exception as exc:
         logger.exception("Analyst signal_mode failed for %s: %s", ticker, exc)
@@ -317,14 +431,24 @@ def _analyst_signal_mode(state: AgentState) -> dict[str, Any]:
         })
 
 
+def _inject_tool_results(
+    result: dict[str, Any], smc_result: dict, elliott_result: dict, wyckoff_result: dict
+) -> dict[str, Any]:
+    """Fill any TA section the LLM left empty with the raw tool result."""
+    # Inject the raw tool results (they won't be lost)
+    if result.get("smc_analysis") is None:
+        result["smc_analysis"] = smc_result
+    if result.get("elliott_analysis") is None:
+        result["elliott_analysis"] = elliott_result
+    if result.get("wyckoff_analysis") is None:
+        result["wyckoff_analysis"] = wyckoff_result
+    return result
+
+
 def _parse_analyst_response(content: str, ticker: str) -> dict[str, Any]:
     """Parse JSON from analyst LLM response and return structured dict."""
-    content = content.strip()
-
-    if "```json" in content:
-        content = content.split("```json")[1].split("```")[0].strip()
-    elif "```" in content:
-        content = content.split("```")[1].split("```")[0].strip()
+    match = _JSON_BLOCK_RE.search(content) or _CODE_BLOCK_RE.search(content)
+    content = match.group(1).strip() if match else content.strip()
 
     try:
         parsed = json.loads(content)
@@ -332,35 +456,58 @@ def _parse_analyst_response(content: str, ticker: str) -> dict[str, Any]:
         logger.warning("Analyst returned non-JSON for %s: %s", ticker, exc)
         return _empty_analyst_result()
 
-    fa_data = parsed.get("financial_analysis", {})
-    ta_data = parsed.get("technical_signals", {})
+    return _analyst_result_from_dict(parsed)
 
-    financial_analysis = FinancialAnalysis(
-        revenue_growth=fa_data.get("revenue_growth", 0),
-        profit_growth=fa_data.get("profit_growth", 0),
-        roe=fa_data.get("roe", 0),
-        pe_ratio=fa_data.get("pe_ratio", 0),
-        debt_to_equity=fa_data.get("debt_to_equity", 0),
-        is_healthy=fa_data.get("is_healthy", False),
-    )
 
-    technical_signals = TechnicalSignals(
-        trend=ta_data.get("trend", "SIDEWAYS"),
-        rsi=ta_data.get("rsi", 50),
-        ma_alignment=ta_data.get("ma_alignment", "N/A"),
-        support_zone=ta_data.get("support_zone", "N/A"),
-        resistance_zone=ta_data.get("resistance_zone", "N/A"),
-    )
+_FA_DEFAULTS = {
+    "revenue_growth": 0, "profit_growth": 0, "roe": 0,
+    "pe_ratio": 0, "debt_to_equity": 0, "is_healthy": False,
+}
+_TA_DEFAULTS = {
+    "trend": "SIDEWAYS", "rsi": 50, "ma_alignment": "N/A",
+    "support_zone": "N/A", "resistance_zone": "N/A",
+}
+
+
+def _analyst_result_from_dict(parsed: dict[str, Any]) -> dict[str, Any]:
+    """Build the analyst state update from parsed JSON or ``emit_analysis`` args.
+
+    Missing fields take neutral defaults; a section that is not an object
+    or fails validation (wrong-typed field) becomes None on its own instead
+    of failing the whole analysis.
+    """
+    if not isinstance(parsed, dict):
+        logger.warning("Analyst result is not an object: %r", type(parsed).__name__)
+        return _empty_analyst_result()
 
     return _sanitize({
-        "financial_analysis": financial_analysis,
-        "technical_signals": technical_signals,
-        "smc_analysis": parsed.get("smc_analysis"),
-        "elliott_analysis": parsed.get("elliott_analysis"),
-        "wyckoff_analysis": parsed.get("wyckoff_analysis"),
+        "financial_analysis": _section(FinancialAnalysis, parsed.get("financial_analysis"), _FA_DEFAULTS),
+        "technical_signals": _section(TechnicalSignals, parsed.get("technical_signals"), _TA_DEFAULTS),
+        "smc_analysis": _dict_or_none(parsed.get("smc_analysis")),
+        "elliott_analysis": _dict_or_none(parsed.get("elliott_analysis")),
+        "wyckoff_analysis": _dict_or_none(parsed.get("wyckoff_analysis")),
     })
 
 
+def _section(model: type[BaseModel], data: Any, defaults: dict[str, Any]) -> BaseModel | None:
+    """``model`` from ``data`` over ``defaults`` (None when it does not validate)."""
+    if data is None:
+        data = {}
+    elif not isinstance(data, dict):
+        logger.warning("Dropping non-object %s from analyst: %r", model.__name__, data)
+        return None
+    fields = {k: v for k, v in data.items() if v is not None}
+    try:
+        return model(**{**defaults, **fields})
+    except ValidationError as exc:
+        logger.warning("Dropping invalid %s from analyst: %s", model.__name__, exc)
+        return None
+
+
+def _dict_or_none(value: Any) -> dict | None:
+    return value if isinstance(value, dict) else None
+
+
 def _empty_analyst_result() -> dict[str, Any]:
     """Default empty result when analysis fails."""
     return {
@@ -377,8 +524,13 @@ def _empty_analyst_result() -> dict[str, Any]:
 # ─────────────────────────────────────────────────────────────────────────────
 
 
-def strategist_node(state: AgentState) -> dict[str, Any]:
-    """Produce final investment strategy and a formatted Markdown report."""
+async def strategist_node(state: AgentState, config: RunnableConfig | None = None) -> dict[str, Any]:
+    """Produce final investment strategy and a formatted Markdown report.
+
+    If ``config["configurable"]["report_queue"]`` holds an ``asyncio.Queue``,
+    the report is streamed into it chunk by chunk (``None`` marks the end),
+    e.g. for ``telegram_service.stream_report``.
+    """
 
     ticker = state["ticker"]
     mode = state.get("mode", "agent_mode")
@@ -386,6 +538,10 @@ def strategist_node(state: AgentState) -> dict[str, Any]:
 
     llm = _get_llm(mode)
 
+    # Entry/target/stop & scenarios are pure arithmetic on the analysis –
+    # compute them up front so they survive an LLM failure
+    strategy = _build_strategy(state)
+
     # Build context from all previous analysis
     fa = state.get("financial_analysis")
     ta = state.get("technical_signals")
@@ -469,68 +625,102 @@ def strategist_node(state: AgentState) -> dict[str, Any]:
     )
 
     messages = [
-        SystemMessage(content=ANALYSIS_SYSTEM_PROMPT),
+        _system_message(ANALYSIS_SYSTEM_PROMPT, mode),
         HumanMessage(content=context),
     ]
 
+    report_queue = ((config or {}).get("configurable") or {}).get("report_queue")
+
     try:
-        response = llm.invoke(messages)
-        final_message = response.content.strip()
-
-        # Try to extract strategy parameters from the report
-        strategy = _extract_strategy_from_report(final_message, state)
-
-        # Save thesis to database
-        try:
-            if strategy:
-                # Serialize scenarios for DB storage
-                scenarios_json = "[]"
-                if strategy.scenarios:
-                    scenarios_json = json.dumps(
-                        [s.model_dump() for s in strategy.scenarios],
-                        default=str, ensure_ascii=False,
-                    )
-                reeval_json = json.dumps(
-                    strategy.reeval_triggers, default=str, ensure_ascii=False,
-                )
-
-                crud.upsert_thesis(
-                    symbol=ticker,
-                    thesis_content=final_message,
-                    target_price=strategy.target_price,
-                    stop_loss_price=strategy.stop_loss,
-                    entry_zone_min=strategy.entry_price_range[0] if strategy.entry_price_range else 0,
-                    entry_zone_max=strategy.entry_price_range[1] if len(strategy.entry_price_range) > 1 else 0,
-                    scenarios_json=scenarios_json,
-                    primary_scenario=strategy.primary_scenario,
-                    reeval_triggers=reeval_json,
-                )
-            else:
-                crud.upsert_thesis(symbol=ticker, thesis_content=final_message)
-        except Exception:
-            logger.warning("Could not save thesis to DB (DB might not be configured)")
+        if report_queue is None:
+            response = await llm.ainvoke(messages)
+            final_message = response.content.strip()
+        else:
+            final_message = (await _stream_to_queue(llm, messages, report_queue)).strip()
+
+        if strategy:
+            strategy = strategy.model_copy(update={"thesis_summary": final_message[:200]})
+
+        # Thesis row for the DB – the caller persists it off the response path
+        thesis = _thesis_kwargs(ticker, strategy, final_message)
 
         return _sanitize({
             "current_strategy": strategy,
             "final_message": final_message,
+            "pending_db_writes": [thesis],
         })
 
     except Exception as exc:
         logger.exception("Strategist node failed for %s: %s", ticker, exc)
-        return {
-            "current_strategy": None,
+        # The deterministic strategy is still worth keeping for the next run
+        pending = [_thesis_kwargs(ticker, strategy, _FALLBACK_THESIS)] if strategy else []
+        return _sanitize({
+            "current_strategy": strategy,
             "final_message": f"❌ Lỗi khi phân tích {ticker}: {exc}",
-        }
+            "pending_db_writes": pending,
+        })
+
+
+_FALLBACK_THESIS = "⚠️ Không tạo được báo cáo AI – tham số chiến lược được tính tự động từ phân tích."
 
 
-def _extract_strategy_from_report(
-    report: str, state: AgentState
-) -> InvestmentStrategy | None:
-    """Best-effort extraction of strategy parameters from the Markdown report."""
+def _thesis_kwargs(ticker: str, strategy: InvestmentStrategy | None, content: str) -> dict[str, Any]:
+    """``crud.upsert_thesis`` kwargs for a strategist result."""
+    thesis: dict[str, Any] = {"symbol": ticker, "thesis_content": content}
+    if strategy:
+        # Serialize scenarios for DB storage
+        scenarios_json = "[]"
+        if strategy.scenarios:
+            scenarios_json = json.dumps(
+                [s.model_dump() for s in strategy.scenarios],
+                default=str, ensure_ascii=False,
+            )
+        reeval_json = json.dumps(
+            strategy.reeval_triggers, default=str, ensure_ascii=False,
+        )
+        thesis.update(
+            target_price=strategy.target_price,
+            stop_loss_price=strategy.stop_loss,
+            entry_zone_min=strategy.entry_price_range[0] if strategy.entry_price_range else 0,
+            entry_zone_max=strategy.entry_price_range[1] if len(strategy.entry_price_range) > 1 else 0,
+            scenarios_json=scenarios_json,
+            primary_scenario=strategy.primary_scenario,
+            reeval_triggers=reeval_json,
+        )
+    return thesis
+
+
+async def _stream_to_queue(llm, messages: list, queue: asyncio.Queue) -> str:
+    """Stream the LLM answer into ``queue`` and return the full text."""
+    parts: list[str] = []
     try:
-        # Defaults
-        thesis_summary = report[:200] if report else ""
+        async for chunk in llm.astream(messages):
+            text = _chunk_text(chunk.content)
+            if text:
+                parts.append(text)
+                queue.put_nowait(text)
+    finally:
+        queue.put_nowait(None)
+    return "".join(parts)
+
+
+def _chunk_text(content: Any) -> str:
+    """Text of a streamed chunk (str, or a list of content blocks for Claude)."""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else str(block)
+        for block in content or []
+    )
+
 
+def _build_strategy(state: AgentState) -> InvestmentStrategy | None:
+    """Best-effort strategy parameters from the structured analysis.
+
+    Deterministic – no LLM involved.  ``thesis_summary`` is left empty; the
+    strategist fills it from the report once the LLM answers.
+    """
+    try:
         fa = state.get("financial_analysis")
         ta = state.get("technical_signals")
         smc = state.get("smc_analysis")
@@ -588,7 +778,7 @@ def _extract_strategy_from_report(
             primary = best.label
 
         return InvestmentStrategy(
-            thesis_summary=thesis_summary,
+            thesis_summary="",
             primary_scenario=primary,
             scenarios=scenarios,
             entry_price_range=[round(entry_low, 0), round(entry_high, 0)],
@@ -4,6 +4,9 @@ Three tools the analyst ReAct agent can call:
   1. get_smc_structures  – Smart Money Concepts (Order Blocks, FVG, BOS/CHoCH)
   2. analyze_elliott_waves – Elliott Wave position & targets
   3. analyze_wyckoff       – Wyckoff phases & Volume Profile
+
+plus ``emit_analysis``, which the agent calls once at the end to hand back
+its structured result (validated against ``AnalystOutput``).
 """
 
 from __future__ import annotations
@@ -13,7 +16,8 @@ from typing import Any
 
 from langchain_core.tools import tool
 
-from services import vnstock_service
+from models.state import AnalystOutput
+from services.data_source import get_data_service
 from services.smc_calculator import SMCCalculator
 from services.elliott_engine import ElliottWaveEngine
 from services.wyckoff_engine import WyckoffEngine
@@ -22,8 +26,8 @@ logger = logging.getLogger(__name__)
 
 
 def _fetch_ohlcv(ticker: str, days: int = 365):
-    """Fetch OHLCV DataFrame via vnstock, return (df, error_dict)."""
-    df = vnstock_service.get_price_history(ticker, days=days)
+    """Fetch OHLCV DataFrame via the bound data service, return (df, error_dict)."""
+    df = get_data_service().get_price_history(ticker, days=days)
     if isinstance(df, dict):
         return None, df  # error
     if df is None or df.empty:
@@ -126,6 +130,28 @@ def analyze_wyckoff(
         return {"error": str(exc)}
 
 
+# ── Output tool ─────────────────────────────────────────────────────────────
+
+EMIT_ANALYSIS_TOOL = "emit_analysis"
+
+
+@tool(EMIT_ANALYSIS_TOOL, args_schema=AnalystOutput, return_direct=True)
+def emit_analysis(
+    financial_analysis: Any,
+    technical_signals: Any,
+    smc_analysis: dict | None = None,
+    elliott_analysis: dict | None = None,
+    wyckoff_analysis: dict | None = None,
+) -> str:
+    """Trả về kết quả phân tích cuối cùng (FA, TA, SMC, Elliott, Wyckoff).
+
+    Gọi tool này MỘT lần, sau khi đã có kết quả từ cả 3 tools phân tích,
+    thay vì trả lời bằng JSON dạng text.
+    """
+    # The arguments are the result – read from the tool call by the analyst
+    return "OK"
+
+
 # ── All tools list (for agent setup) ────────────────────────────────────────
 
 ANALYST_TOOLS = [get_smc_structures, analyze_elliott_waves, analyze_wyckoff]
@@ -7,13 +7,15 @@ Both ``signal_mode`` and ``agent_mode`` run the **same** 3-step pipeline
 * **signal_mode** → DeepSeek R1 (OpenAI-compatible)
 
 The pipeline code lives in ``agents/nodes.py`` and is shared 1:1 with the
-live system.  The only difference is that ``vnstock_service`` is monkey-patched
-to ``VnstockBacktestService`` so data comes from the ``LookbackProvider``
-instead of the live API.
+live system.  The only difference is that ``VnstockBacktestService`` is bound
+as the pipeline's data source (``services.data_source``) for each run, so data
+comes from the ``LookbackProvider`` instead of the live API.
 """
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
 import json
 import logging
 from typing import Any
@@ -21,6 +23,8 @@ from typing import Any
 import backtrader as bt
 
 from backtesting.lookback_provider import LookbackProvider
+from services import http_client
+from services.data_source import use_data_service
 from services.vnstock_backtest_service import VnstockBacktestService
 
 logger = logging.getLogger(__name__)
@@ -68,11 +72,18 @@ class AgentStrategy(bt.Strategy):
         self._last_signal: str = SIGNAL_HOLD
         self._last_reasoning: str = ""
         self.stopped_early: bool = False
+        # One event loop for every bar: the cached LLM clients keep their
+        # HTTP connections across calls, which a fresh loop per bar breaks
+        self._runner: asyncio.Runner | None = None
 
     # ------------------------------------------------------------------
     # Backtrader lifecycle
     # ------------------------------------------------------------------
 
+    def start(self):
+        """Called before the first bar — opens the pipeline's event loop."""
+        self._runner = asyncio.Runner()
+
     def next(self):
         """Called on every bar — delegates to the shared AI pipeline."""
         bar_idx = len(self) - 1
@@ -116,6 +127,12 @@ class AgentStrategy(bt.Strategy):
 
     def stop(self):
         """Called when backtest finishes."""
+        if self._runner is not None:
+            try:
+                self._runner.run(http_client.aclose_loop())
+            finally:
+                self._runner.close()
+                self._runner = None
         logger.info(
             "🏁 Backtest finished — %d trades recorded, final portfolio: %.0f",
             len(self.trade_log), self.broker.getvalue(),
@@ -142,11 +159,11 @@ class AgentStrategy(bt.Strategy):
     def _run_pipeline(self) -> dict[str, Any]:
         """Run the real agent pipeline (researcher → analyst → strategist).
 
-        The only difference from live execution is that ``vnstock_service``
-        functions are monkey-patched to read from the LookbackProvider
-        instead of the live API.
+        The only difference from live execution is that the data source is
+        bound to the LookbackProvider instead of the live API.  The binding
+        is context-local (and the module stays untouched), so concurrent
+        live ``/analyze`` requests and other backtests are unaffected.
         """
-        import services.vnstock_service as live_svc
         from agents.nodes import (
             researcher_node, analyst_node, strategist_node,
             _sanitize,
@@ -159,53 +176,40 @@ class AgentStrategy(bt.Strategy):
 
         backtest_svc = VnstockBacktestService(provider)
 
-        # Save original functions
-        orig_get_price = live_svc.get_price_history
-        orig_get_current = live_svc.get_current_price
-        orig_calc_tech = live_svc.calculate_technical_indicators
-        orig_get_fin = live_svc.get_financial_ratios
-
-        try:
-            # Monkey-patch with backtest service (offline data)
-            live_svc.get_price_history = backtest_svc.get_price_history
-            live_svc.get_current_price = backtest_svc.get_current_price
-            live_svc.calculate_technical_indicators = backtest_svc.calculate_technical_indicators
-            live_svc.get_financial_ratios = backtest_svc.get_financial_ratios
-
-            # Build initial state — uses the SAME AgentState as live
-            state: AgentState = {
-                "ticker": self.p.ticker,
-                "mode": self.p.mode,  # ← this controls which LLM nodes use
-                "current_price": 0.0,
-                "raw_financials": {},
-                "raw_news": [],
-                "raw_ohlc": {},
-                "financial_analysis": None,
-                "technical_signals": None,
-                "smc_analysis": None,
-                "elliott_analysis": None,
-                "wyckoff_analysis": None,
-                "previous_thesis": None,
-                "previous_scenarios": None,
-                "current_strategy": None,
-                "daily_delta_note": None,
-                "final_message": "",
-            }
-
-            # Run the SAME nodes as the live pipeline
-            state.update(researcher_node(state))
-            state.update(analyst_node(state))
-            state.update(strategist_node(state))
-
-            # Extract trading signal from the strategy result
-            return self._extract_signal(state)
-
-        finally:
-            # Restore original functions
-            live_svc.get_price_history = orig_get_price
-            live_svc.get_current_price = orig_get_current
-            live_svc.calculate_technical_indicators = orig_calc_tech
-            live_svc.get_financial_ratios = orig_get_fin
+        # Build initial state — uses the SAME AgentState as live
+        state: AgentState = {
+            "ticker": self.p.ticker,
+            "mode": self.p.mode,  # ← this controls which LLM nodes use
+            "current_price": 0.0,
+            "raw_financials": {},
+            "raw_news": [],
+            "raw_ohlc": {},
+            "financial_analysis": None,
+            "technical_signals": None,
+            "smc_analysis": None,
+            "elliott_analysis": None,
+            "wyckoff_analysis": None,
+            "previous_thesis": None,
+            "previous_scenarios": None,
+            "current_strategy": None,
+            "daily_delta_note": None,
+            "final_message": "",
+        }
+
+        # Run the SAME nodes as the live pipeline
+        async def _run_nodes() -> None:
+            state.update(await researcher_node(state))
+            state.update(await analyst_node(state))
+            state.update(await strategist_node(state))
+
+        # Offline data for this run only (tasks & threads inherit the binding)
+        with use_data_service(backtest_svc):
+            # Runner.run defaults to the context captured when the loop
+            # started – pass the current one so the binding is seen
+            self._runner.run(_run_nodes(), context=contextvars.copy_context())
+
+        # Extract trading signal from the strategy result
+        return self._extract_signal(state)
 
     @staticmethod
     def _extract_signal(state: dict) -> dict[str, Any]:
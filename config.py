@@ -2,7 +2,6 @@
 
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from functools import lru_cache
 
 
 class Settings(BaseSettings):
@@ -30,6 +29,9 @@ class Settings(BaseSettings):
     supabase_url: str = Field(default="", description="Supabase project URL")
     supabase_key: str = Field(default="", description="Supabase anon/service key")
 
+    # Cache
+    redis_url: str = Field(default="", description="Redis URL for the API response cache (empty = in-memory)")
+
     # Telegram
     telegram_bot_token: str = Field(default="", description="Telegram Bot token")
     telegram_chat_id: str = Field(default="", description="Telegram chat ID for alerts")
@@ -51,7 +53,10 @@ class Settings(BaseSettings):
     }
 
 
-@lru_cache()
+# Loaded once at import – use ``from config import settings``
+settings = Settings()
+
+
 def get_settings() -> Settings:
-    """Return a cached Settings singleton."""
-    return Settings()
+    """Return the module-level Settings singleton."""
+    return settings
@@ -3,13 +3,21 @@
 from __future__ import annotations
 
 import logging
+import threading
 from datetime import datetime, date
 from typing import Any, Optional
 
+from cachetools import TTLCache
+
 from database.supabase_client import get_supabase
 
 logger = logging.getLogger(__name__)
 
+# Latest thesis per symbol – read on every analysis, written rarely.
+# TTLCache is not thread-safe and callers run in worker threads.
+_thesis_cache: TTLCache = TTLCache(maxsize=512, ttl=300)
+_thesis_cache_lock = threading.Lock()
+
 
 # ── Stocks ───────────────────────────────────────────────────────────────────
 
@@ -57,15 +65,13 @@ def add_to_watchlist(
 
 
 def get_active_watchlist() -> list[dict[str, Any]]:
-    """Return all watchlist entries with status='active'."""
+    """Return all watchlist entries with status='active', newest first.
+
+    Each row is flat: watchlist columns plus ``company_name``, ``industry``
+    and ``exchange`` of the stock (RPC from migration 003).
+    """
     db = get_supabase()
-    result = (
-        db.table("watchlist")
-        .select("*, stocks(company_name, industry, exchange)")
-        .eq("status", "active")
-        .order("added_at", desc=True)
-        .execute()
-    )
+    result = db.rpc("get_active_watchlist_flat").execute()
     return result.data or []
 
 
@@ -85,7 +91,7 @@ def close_watchlist_item(symbol: str) -> bool:
 # ── Investment Theses ────────────────────────────────────────────────────────
 
 
-def upsert_thesis(
+def _thesis_row(
     symbol: str,
     thesis_content: str,
     intrinsic_value: float = 0,
@@ -98,9 +104,8 @@ def upsert_thesis(
     primary_scenario: str = "BASE",
     reeval_triggers: str = "[]",
 ) -> dict[str, Any]:
-    """Insert or update an investment thesis for a symbol."""
-    db = get_supabase()
-    data = {
+    """Build an ``investment_theses`` row from ``upsert_thesis`` arguments."""
+    return {
         "symbol": symbol.upper(),
         "thesis_content": thesis_content,
         "intrinsic_value": intrinsic_value,
@@ -114,22 +119,100 @@ def upsert_thesis(
         "reeval_triggers": reeval_triggers,
         "last_updated": datetime.utcnow().isoformat(),
     }
+
+
+def upsert_thesis(
+    symbol: str,
+    thesis_content: str,
+    intrinsic_value: float = 0,
+    target_price: float = 0,
+    stop_loss_price: float = 0,
+    entry_zone_min: float = 0,
+    entry_zone_max: float = 0,
+    sentiment_score: float = 0.5,
+    scenarios_json: str = "[]",
+    primary_scenario: str = "BASE",
+    reeval_triggers: str = "[]",
+) -> dict[str, Any]:
+    """Insert or update an investment thesis for a symbol."""
+    db = get_supabase()
+    data = _thesis_row(
+        symbol, thesis_content, intrinsic_value, target_price, stop_loss_price,
+        entry_zone_min, entry_zone_max, sentiment_score, scenarios_json,
+        primary_scenario, reeval_triggers,
+    )
     result = db.table("investment_theses").insert(data).execute()
+    with _thesis_cache_lock:
+        _thesis_cache.pop(symbol.upper(), None)
     return result.data[0] if result.data else data
 
 
+def upsert_theses_bulk(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Insert many theses in a single request.
+
+    Each row takes the same keys as ``upsert_thesis`` keyword arguments.
+    Theses are append-only history (latest wins), so this is a multi-row
+    insert rather than an ON CONFLICT upsert.
+    """
+    if not rows:
+        return []
+    db = get_supabase()
+    data = [_thesis_row(**row) for row in rows]
+    result = db.table("investment_theses").insert(data).execute()
+    with _thesis_cache_lock:
+        for row in data:
+            _thesis_cache.pop(row["symbol"], None)
+    return result.data or data
+
+
 def get_latest_thesis(symbol: str) -> Optional[dict[str, Any]]:
-    """Get the most recent investment thesis for a symbol."""
+    """Get the most recent investment thesis for a symbol.
+
+    Served from a 5-minute in-process cache; ``upsert_thesis`` invalidates it.
+    """
+    key = symbol.upper()
+    with _thesis_cache_lock:
+        if key in _thesis_cache:
+            return _thesis_cache[key]
+
     db = get_supabase()
     result = (
         db.table("investment_theses")
         .select("*")
-        .eq("symbol", symbol.upper())
+        .eq("symbol", key)
         .order("last_updated", desc=True)
         .limit(1)
         .execute()
     )
-    return result.data[0] if result.data else None
+    thesis = result.data[0] if result.data else None
+    with _thesis_cache_lock:
+        _thesis_cache[key] = thesis
+    return thesis
+
+
+def get_latest_theses_bulk(symbols: list[str]) -> dict[str, Optional[dict[str, Any]]]:
+    """Latest thesis of every symbol in one round-trip (RPC from migration 004).
+
+    Returns ``{SYMBOL: thesis or None}`` for every requested symbol; cached
+    entries are reused and the fetched ones fill ``get_latest_thesis``'s cache.
+    """
+    keys = list(dict.fromkeys(s.upper() for s in symbols))
+    theses: dict[str, Optional[dict[str, Any]]] = {}
+    with _thesis_cache_lock:
+        for key in keys:
+            if key in _thesis_cache:
+                theses[key] = _thesis_cache[key]
+    missing = [key for key in keys if key not in theses]
+    if not missing:
+        return theses
+
+    db = get_supabase()
+    result = db.rpc("get_latest_theses_bulk", {"symbols": missing}).execute()
+    fetched = {row["symbol"]: row for row in result.data or []}
+    with _thesis_cache_lock:
+        for key in missing:
+            theses[key] = _thesis_cache[key] = fetched.get(key)
+    return theses
 
 
 def get_active_scenarios(symbol: str) -> list[dict[str, Any]]:
@@ -152,7 +235,7 @@ def get_active_scenarios(symbol: str) -> list[dict[str, Any]]:
 # ── Daily Snapshots ──────────────────────────────────────────────────────────
 
 
-def insert_snapshot(
+def _snapshot_row(
     symbol: str,
     close_price: float,
     volume: int,
@@ -161,9 +244,8 @@ def insert_snapshot(
     action_signal: str = "HOLD",
     snapshot_date: Optional[date] = None,
 ) -> dict[str, Any]:
-    """Insert a daily snapshot for a symbol."""
-    db = get_supabase()
-    data = {
+    """Build a ``daily_snapshots`` row from ``insert_snapshot`` arguments."""
+    return {
         "symbol": symbol.upper(),
         "date": (snapshot_date or date.today()).isoformat(),
         "close_price": close_price,
@@ -172,6 +254,23 @@ def insert_snapshot(
         "ai_commentary": ai_commentary,
         "action_signal": action_signal,
     }
+
+
+def insert_snapshot(
+    symbol: str,
+    close_price: float,
+    volume: int,
+    change_percent: float,
+    ai_commentary: str = "",
+    action_signal: str = "HOLD",
+    snapshot_date: Optional[date] = None,
+) -> dict[str, Any]:
+    """Insert a daily snapshot for a symbol."""
+    db = get_supabase()
+    data = _snapshot_row(
+        symbol, close_price, volume, change_percent,
+        ai_commentary, action_signal, snapshot_date,
+    )
     result = (
         db.table("daily_snapshots")
         .upsert(data, on_conflict="symbol,date")
@@ -180,6 +279,29 @@ def insert_snapshot(
     return result.data[0] if result.data else data
 
 
+def insert_snapshots_bulk(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Upsert many daily snapshots in a single request.
+
+    Each row takes the same keys as ``insert_snapshot`` arguments.  Rows
+    for the same (symbol, date) collapse to the last one – Postgres rejects
+    an upsert that touches one row twice.
+    """
+    if not rows:
+        return []
+    db = get_supabase()
+    keyed = {}
+    for row in rows:
+        snapshot = _snapshot_row(**row)
+        keyed[snapshot["symbol"], snapshot["date"]] = snapshot
+    data = list(keyed.values())
+    result = (
+        db.table("daily_snapshots")
+        .upsert(data, on_conflict="symbol,date")
+        .execute()
+    )
+    return result.data or data
+
+
 def get_snapshots_by_symbol(
     symbol: str, limit: int = 30
 ) -> list[dict[str, Any]]:
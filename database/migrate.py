@@ -7,17 +7,32 @@ Usage:
 
 from __future__ import annotations
 
-import hashlib
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 
+import blake3
 import psycopg2
 from dotenv import load_dotenv
 
 load_dotenv()
 
 MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+CHECKSUM_ALGO = "blake3"
+REGION_CACHE_FILE = Path(__file__).parent.parent / ".cache" / "migrate_region"
+
+# Common Supabase pooler regions
+REGIONS = [
+    "ap-southeast-1",  # Singapore
+    "us-east-1",       # N. Virginia
+    "us-west-1",       # N. California
+    "eu-west-1",       # Ireland
+    "eu-central-1",    # Frankfurt
+    "ap-northeast-1",  # Tokyo
+    "ap-south-1",      # Mumbai
+]
 
 
 def _get_connection():
@@ -25,7 +40,8 @@ def _get_connection():
 
     Priority:
       1. DATABASE_URL (if set, use as-is)
-      2. Auto-construct from SUPABASE_URL + SUPABASE_PASSWORD, trying regions
+      2. Auto-construct from SUPABASE_URL + SUPABASE_PASSWORD: the region
+         cached in .cache/migrate_region, else all regions probed in parallel
     """
     # Option 1: explicit DATABASE_URL
     database_url = os.getenv("DATABASE_URL", "")
@@ -42,31 +58,50 @@ def _get_connection():
 
     ref = url.replace("https://", "").replace(".supabase.co", "").strip("/")
 
-    # Try common Supabase pooler regions
-    regions = [
-        "ap-southeast-1",  # Singapore
-        "us-east-1",       # N. Virginia
-        "us-west-1",       # N. California
-        "eu-west-1",       # Ireland
-        "eu-central-1",    # Frankfurt
-        "ap-northeast-1",  # Tokyo
-        "ap-south-1",      # Mumbai
-    ]
-
     from urllib.parse import quote as url_quote
     safe_pw = url_quote(password, safe="")
 
-    for region in regions:
+    def connect(region: str):
         conn_str = (
             f"postgresql://postgres.{ref}:{safe_pw}"
             f"@aws-0-{region}.pooler.supabase.com:6543/postgres"
         )
+        return psycopg2.connect(conn_str, connect_timeout=5)
+
+    # Region that worked last time – skip probing entirely
+    cached = _read_cached_region()
+    if cached:
         try:
-            conn = psycopg2.connect(conn_str, connect_timeout=5)
-            print(f"✅ Connected via region: {region}")
+            conn = connect(cached)
+            print(f"✅ Connected via cached region: {cached}")
             return conn
-        except psycopg2.OperationalError:
-            continue
+        except Exception:
+            pass
+
+    # Probe all regions concurrently, keep the first that answers
+    pool = ThreadPoolExecutor(max_workers=len(REGIONS))
+    futures = {pool.submit(connect, r): r for r in REGIONS}
+    conn, region, winner = None, None, None
+    try:
+        for future in as_completed(futures):
+            try:
+                conn = future.result()
+            except Exception:  # auth, DNS, timeout – any failed probe
+                continue
+            region, winner = futures[future], future
+            break
+    finally:
+        # Don't wait for the slower probes (running ones can't be cancelled);
+        # close whatever connection they still open
+        pool.shutdown(wait=False, cancel_futures=True)
+        for future in futures:
+            if future is not winner:
+                future.add_done_callback(_close_late_connection)
+
+    if conn is not None:
+        print(f"✅ Connected via region: {region}")
+        _write_cached_region(region)
+        return conn
 
     print("❌ Could not connect to any Supabase region.")
     print("   Please set DATABASE_URL in .env directly.")
@@ -74,6 +109,27 @@ def _get_connection():
     sys.exit(1)
 
 
+def _close_late_connection(future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def _read_cached_region() -> str | None:
+    try:
+        region = REGION_CACHE_FILE.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    return region if region in REGIONS else None
+
+
+def _write_cached_region(region: str) -> None:
+    try:
+        REGION_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        REGION_CACHE_FILE.write_text(region, encoding="utf-8")
+    except OSError:
+        pass  # cache is best-effort
+
+
 def _ensure_migrations_table(conn):
     """Create the migrations tracking table if it doesn't exist."""
     with conn.cursor() as cur:
@@ -85,6 +141,11 @@ def _ensure_migrations_table(conn):
                 applied_at  TIMESTAMPTZ DEFAULT now()
             );
         """)
+        # Rows written before the switch to BLAKE3 hold MD5 checksums
+        cur.execute("""
+            ALTER TABLE _migrations
+            ADD COLUMN IF NOT EXISTS checksum_algo TEXT NOT NULL DEFAULT 'md5';
+        """)
     conn.commit()
 
 
@@ -96,7 +157,13 @@ def _get_applied(conn) -> set[str]:
 
 
 def _file_checksum(path: Path) -> str:
-    return hashlib.md5(path.read_bytes()).hexdigest()
+    return _hash_file(path, path.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=None)
+def _hash_file(path: Path, mtime_ns: int) -> str:
+    """BLAKE3 of the file; mtime_ns is part of the key so edits re-hash."""
+    return blake3.blake3(path.read_bytes()).hexdigest()
 
 
 def run_migrations():
@@ -120,18 +187,17 @@ def run_migrations():
             print("✅ All migrations already applied.")
             return
 
-        for f in pending:
-            print(f"▶️  Applying: {f.name} ... ", end="", flush=True)
-            sql = f.read_text(encoding="utf-8")
-
-            with conn.cursor() as cur:
-                cur.execute(sql)
+        # All pending files run in one transaction – all or nothing, one commit
+        with conn.cursor() as cur:
+            for f in pending:
+                print(f"▶️  Applying: {f.name} ... ", end="", flush=True)
+                cur.execute(f.read_text(encoding="utf-8"))
                 cur.execute(
-                    "INSERT INTO _migrations (filename, checksum) VALUES (%s, %s);",
-                    (f.name, _file_checksum(f)),
+                    "INSERT INTO _migrations (filename, checksum, checksum_algo) VALUES (%s, %s, %s);",
+                    (f.name, _file_checksum(f), CHECKSUM_ALGO),
                 )
-            conn.commit()
-            print("✅")
+                print("✅")
+        conn.commit()
 
         print(f"\n🎉 Applied {len(pending)} migration(s) successfully!")
 
@@ -0,0 +1,28 @@
+-- ============================================================================
+-- Flat active-watchlist RPC
+-- Replaces the PostgREST embedded select "*, stocks(...)" with a plain JOIN:
+-- one row per item, stock columns aliased at top level (no nested JSON).
+-- Column types must match 001 exactly (SQL functions do not coerce).
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION get_active_watchlist_flat()
+RETURNS TABLE (
+    id            BIGINT,
+    symbol        TEXT,
+    added_at      TIMESTAMPTZ,
+    status        TEXT,
+    initial_notes TEXT,
+    company_name  TEXT,
+    industry      TEXT,
+    exchange      TEXT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT w.id, w.symbol, w.added_at, w.status, w.initial_notes,
+           s.company_name, s.industry, s.exchange
+    FROM watchlist w
+    LEFT JOIN stocks s ON s.symbol = w.symbol
+    WHERE w.status = 'active'
+    ORDER BY w.added_at DESC;
+$$;
@@ -0,0 +1,16 @@
+-- ============================================================================
+-- Bulk read RPC for the daily follow-up
+-- One call for N symbols instead of one PostgREST request per symbol
+-- ============================================================================
+
+-- Most recent thesis of every requested symbol (symbols without one are absent)
+CREATE OR REPLACE FUNCTION get_latest_theses_bulk(symbols TEXT[])
+RETURNS SETOF investment_theses
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT DISTINCT ON (t.symbol) t.*
+    FROM investment_theses t
+    WHERE t.symbol = ANY(symbols)
+    ORDER BY t.symbol, t.last_updated DESC;
+$$;
@@ -1,27 +1,37 @@
-"""Supabase client singleton."""
+"""Supabase client singleton.
+
+``crud`` talks to Postgres through PostgREST over HTTPS, so the database
+connections themselves are pooled server-side by Supabase.  What matters on
+our side is that every request – including the ``asyncio.to_thread`` calls
+from FastAPI – shares one client and therefore one keep-alive HTTP pool.
+"""
 
 from __future__ import annotations
 
 import logging
+import threading
 
 from supabase import create_client, Client
 
-from config import get_settings
+from config import settings
 
 logger = logging.getLogger(__name__)
 
 _client: Client | None = None
+_client_lock = threading.Lock()
 
 
 def get_supabase() -> Client:
-    """Return a cached Supabase client instance."""
+    """Return a cached Supabase client instance (thread-safe)."""
     global _client
     if _client is None:
-        settings = get_settings()
-        if not settings.supabase_url or not settings.supabase_key:
-            raise RuntimeError(
-                "SUPABASE_URL and SUPABASE_KEY must be set in environment."
-            )
-        _client = create_client(settings.supabase_url, settings.supabase_key)
-        logger.info("Supabase client initialised → %s", settings.supabase_url)
+        with _client_lock:
+            # Another thread may have created it while we waited
+            if _client is None:
+                if not settings.supabase_url or not settings.supabase_key:
+                    raise RuntimeError(
+                        "SUPABASE_URL and SUPABASE_KEY must be set in environment."
+                    )
+                _client = create_client(settings.supabase_url, settings.supabase_key)
+                logger.info("Supabase client initialised → %s", settings.supabase_url)
     return _client
@@ -2,15 +2,29 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from collections import defaultdict
 from contextlib import asynccontextmanager
-
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Query
+from typing import Annotated
+
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Path, Query
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.decorator import cache
 from pydantic import BaseModel, Field
+from redis import asyncio as aioredis
 
+from agents.batch import run_batch_analysis
 from agents.graph import run_analysis
+from config import settings
 from database import crud
-from services.telegram_service import send_report
+from models.state import Symbol
+from services import http_client
+from services.telegram_service import RateLimiter, send_report, stream_report
 
 logging.basicConfig(
     level=logging.INFO,
@@ -19,13 +33,83 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# ── Telegram delivery ────────────────────────────────────────────────────────
+
+# Stay well under Telegram's ~30 msg/s global bot limit
+_TELEGRAM_SEND_INTERVAL_S = 1 / 25
+_TELEGRAM_DRAIN_TIMEOUT_S = 30
+
+
+async def _telegram_worker(queue: asyncio.Queue, limiter: RateLimiter) -> None:
+    """Single consumer: send queued ``(ticker, report)`` pairs one at a time."""
+    while True:
+        ticker, report = await queue.get()
+        try:
+            await limiter.wait()
+            await send_report(ticker, report)
+        except Exception:
+            logger.exception("Failed to send report for %s", ticker)
+        finally:
+            queue.task_done()
+
+
+# ── Known stocks ─────────────────────────────────────────────────────────────
+
+# Symbols known to have a `stocks` row – skips a no-op upsert per request
+_known_stocks: set[str] = set()
+# One lock per symbol: first-time adds of unrelated symbols don't queue up
+_known_stocks_locks: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
+async def _ensure_stock(symbol: str) -> None:
+    """Upsert the stock row once per process; later calls are a set lookup."""
+    if symbol in _known_stocks:
+        return
+    async with _known_stocks_locks[symbol]:
+        if symbol in _known_stocks:
+            return
+        try:
+            await asyncio.to_thread(crud.upsert_stock, symbol=symbol)
+        except Exception:
+            logger.warning("Could not upsert stock to DB (DB might not be configured)")
+            return
+        _known_stocks.add(symbol)
+    _known_stocks_locks.pop(symbol, None)  # never needed again
+
+
 # ── Lifespan ─────────────────────────────────────────────────────────────────
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    logger.info("🚀 VN-Stock AI Copilot starting up …")
+    loop = asyncio.get_running_loop()
+    logger.info("🚀 VN-Stock AI Copilot starting up … (event loop: %s.%s)",
+                type(loop).__module__, type(loop).__qualname__)
+    # Reports go through one rate-limited consumer instead of a task each;
+    # streamed edits share its limiter
+    app.state.tg_limiter = RateLimiter(_TELEGRAM_SEND_INTERVAL_S)
+    app.state.tg_queue = asyncio.Queue()
+    app.state.tg_task = asyncio.create_task(
+        _telegram_worker(app.state.tg_queue, app.state.tg_limiter)
+    )
+    # Response cache for read-only endpoints – Redis if configured
+    if settings.redis_url:
+        FastAPICache.init(RedisBackend(aioredis.from_url(settings.redis_url)), prefix="vnstk")
+    else:
+        FastAPICache.init(InMemoryBackend(), prefix="vnstk")
+    # Watchlist symbols always have a stock row (FK)
+    try:
+        watchlist = await asyncio.to_thread(crud.get_active_watchlist)
+        _known_stocks.update(item["symbol"] for item in watchlist)
+    except Exception:
+        logger.warning("Could not preload watchlist symbols (DB might not be configured)")
     yield
     logger.info("👋 VN-Stock AI Copilot shutting down …")
+    try:
+        await asyncio.wait_for(app.state.tg_queue.join(), timeout=_TELEGRAM_DRAIN_TIMEOUT_S)
+    except asyncio.TimeoutError:
+        logger.warning("Dropping %d unsent Telegram reports", app.state.tg_queue.qsize())
+    app.state.tg_task.cancel()
+    await http_client.aclose()
 
 
 app = FastAPI(
@@ -42,6 +126,7 @@ app = FastAPI(
     ),
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     openapi_tags=[
         {"name": "Analysis", "description": "AI-powered stock analysis (LangGraph pipeline)"},
         {"name": "Backtest", "description": "Backtesting AI strategies on historical data"},
@@ -53,16 +138,27 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+# Reports are multi-KB Markdown and snapshot lists tens of KB of JSON
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
 
 # ── Schemas ──────────────────────────────────────────────────────────────────
 
+# Path ``{ticker}`` / ``{symbol}`` – validated & upper-cased before the handler
+SymbolPath = Annotated[Symbol, Path(description="Mã cổ phiếu (VD: VNM)")]
+
+
 class WatchlistAddRequest(BaseModel):
-    symbol: str = Field(..., example="VNM", description="Mã cổ phiếu (HOSE/HNX/UPCOM)")
+    symbol: Symbol = Field(..., example="VNM", description="Mã cổ phiếu (HOSE/HNX/UPCOM)")
     initial_notes: str = Field(default="", example="Blue-chip ngành sữa", description="Ghi chú ban đầu")
 
     model_config = {"json_schema_extra": {"examples": [{"symbol": "VNM", "initial_notes": "Blue-chip ngành sữa"}]}}
 
 
+class BatchAnalysisRequest(BaseModel):
+    tickers: list[Symbol] = Field(..., min_length=1, max_length=100, example=["VNM", "FPT"], description="Danh sách mã cổ phiếu")
+
+
 class AnalysisResponse(BaseModel):
     ticker: str = Field(..., example="VNM", description="Mã cổ phiếu")
     report: str = Field(..., description="Báo cáo phân tích Markdown")
@@ -79,7 +175,7 @@ async def health():
 
 @app.post("/analyze/{ticker}", response_model=AnalysisResponse, tags=["Analysis"], summary="Phân tích mã cổ phiếu")
 async def analyze_ticker(
-    ticker: str,
+    ticker: SymbolPath,
     background_tasks: BackgroundTasks,
     mode: str = Query(
         default="agent_mode",
@@ -92,22 +188,25 @@ async def analyze_ticker(
     **agent_mode** (default): Full Claude pipeline — highest quality.
     **signal_mode**: DeepSeek R1 — faster, lower cost.
     """
-    ticker = ticker.upper()
     logger.info("📩 Received analysis request for %s [%s]", ticker, mode)
 
     try:
-        # Ensure stock exists in DB
-        try:
-            crud.upsert_stock(symbol=ticker)
-        except Exception:
-            logger.warning("Could not upsert stock to DB (DB might not be configured)")
+        # Stream the strategist's report to Telegram while it is generated
+        report_queue: asyncio.Queue = asyncio.Queue()
+        stream_task = asyncio.create_task(
+            stream_report(ticker, report_queue, app.state.tg_limiter)
+        )
 
         # Run the LangGraph pipeline with selected mode
-        result = run_analysis(ticker, mode=mode)
+        try:
+            result = await run_analysis(ticker, mode=mode, report_queue=report_queue)
+        finally:
+            report_queue.put_nowait(None)  # in case the strategist never ran
         report = result.get("final_message", "")
 
-        # Send to Telegram in background
-        background_tasks.add_task(send_report, ticker, report)
+        # Persist & finish Telegram delivery in background – after the response
+        background_tasks.add_task(_persist_analysis, ticker, result.get("pending_db_writes", []))
+        background_tasks.add_task(_finish_report, ticker, report, stream_task)
 
         return AnalysisResponse(ticker=ticker, report=report)
 
@@ -116,14 +215,67 @@ async def analyze_ticker(
         raise HTTPException(status_code=500, detail=str(exc))
 
 
+async def _finish_report(ticker: str, report: str, stream_task: asyncio.Task) -> None:
+    """Background job: wait for the streamed report; send the final one if it differs.
+
+    Covers nothing streamed as well as a stream cut short – e.g. the
+    strategist failing mid-answer, whose "❌ Lỗi…" message then follows
+    the partial text.
+    """
+    streamed = await stream_task
+    if streamed.strip() != report.strip():
+        await app.state.tg_queue.put((ticker, report))
+
+
+async def _persist_analysis(ticker: str, theses: list[dict]) -> None:
+    """Background job: save the stock and the theses produced by the pipeline."""
+    # Ensure stock exists in DB (FK of investment_theses)
+    await _ensure_stock(ticker)
+    try:
+        for thesis in theses:
+            await asyncio.to_thread(crud.upsert_thesis, **thesis)
+    except Exception:
+        logger.warning("Could not save analysis for %s (DB might not be configured)", ticker)
+
+
+@app.post("/analyze", status_code=202, tags=["Analysis"], summary="Phân tích nhiều mã (batch)")
+async def analyze_bulk(req: BatchAnalysisRequest, background_tasks: BackgroundTasks):
+    """Queue a bulk analysis for many tickers (e.g. a watchlist scan).
+
+    The analyst stage goes through the Anthropic **Message Batches API**
+    (≈50% cheaper, but minutes instead of seconds), so the work runs in the
+    background and every report is sent to Telegram when ready.
+    """
+    tickers = list(dict.fromkeys(req.tickers))
+    logger.info("📩 Received batch analysis request for %d tickers", len(tickers))
+    background_tasks.add_task(_run_bulk_analysis, tickers)
+    return {"status": "queued", "count": len(tickers), "tickers": tickers}
+
+
+async def _run_bulk_analysis(tickers: list[str]) -> None:
+    """Background job: batch-analyse ``tickers`` and send each report."""
+    for ticker in tickers:
+        await _ensure_stock(ticker)
+
+    try:
+        results = await run_batch_analysis(tickers)
+    except Exception:
+        logger.exception("Batch analysis failed for %s", tickers)
+        return
+
+    for result in results:
+        await app.state.tg_queue.put((result["ticker"], result.get("final_message", "")))
+
+
 @app.post("/watchlist", tags=["Watchlist"], summary="Thêm mã vào watchlist")
 async def add_watchlist(req: WatchlistAddRequest):
     """Thêm một mã cổ phiếu vào danh mục theo dõi (status = active)."""
-    symbol = req.symbol.upper()
+    symbol = req.symbol
     try:
         # Ensure stock record exists
-        crud.upsert_stock(symbol=symbol)
-        item = crud.add_to_watchlist(symbol=symbol, initial_notes=req.initial_notes)
+        await _ensure_stock(symbol)
+        item = await asyncio.to_thread(crud.add_to_watchlist, symbol=symbol, initial_notes=req.initial_notes)
+        await FastAPICache.clear(namespace="watchlist")
         return {"status": "added", "data": item}
     except Exception as exc:
         logger.exception("Failed to add %s to watchlist", symbol)
@@ -131,10 +283,11 @@ async def add_watchlist(req: WatchlistAddRequest):
 
 
 @app.get("/watchlist", tags=["Watchlist"], summary="Xem danh mục theo dõi")
+@cache(expire=30, namespace="watchlist")
 async def list_watchlist():
     """Liệt kê tất cả mã đang active trong watchlist."""
     try:
-        items = crud.get_active_watchlist()
+        items = await asyncio.to_thread(crud.get_active_watchlist)
         return {"status": "ok", "count": len(items), "data": items}
     except Exception as exc:
         logger.exception("Failed to fetch watchlist")
@@ -142,16 +295,16 @@ async def list_watchlist():
 
 
 @app.delete("/watchlist/{symbol}", tags=["Watchlist"], summary="Đóng mã khỏi watchlist")
-async def close_watchlist(symbol: str):
+async def close_watchlist(symbol: SymbolPath):
     """Đánh dấu một mã là 'closed' — không còn theo dõi hàng ngày."""
-    symbol = symbol.upper()
     try:
-        success = crud.close_watchlist_item(symbol)
+        success = await asyncio.to_thread(crud.close_watchlist_item, symbol)
         if not success:
             raise HTTPException(
                 status_code=404,
                 detail=f"No active watchlist item found for {symbol}",
             )
+        await FastAPICache.clear(namespace="watchlist")
         return {"status": "closed", "symbol": symbol}
     except HTTPException:
         raise
@@ -161,13 +314,14 @@ async def close_watchlist(symbol: str):
 
 
 @app.get("/snapshots/{symbol}", tags=["Snapshots"], summary="Lịch sử biến động")
+@cache(expire=60, namespace="snapshots")
 async def get_snapshots(
-    symbol: str,
+    symbol: SymbolPath,
     limit: int = Query(default=30, ge=1, le=365, description="Số phiên gần nhất"),
 ):
     """Lấy lịch sử daily snapshots (giá, volume, AI commentary, tín hiệu) cho một mã."""
     try:
-        data = crud.get_snapshots_by_symbol(symbol.upper(), limit=limit)
+        data = await asyncio.to_thread(crud.get_snapshots_by_symbol, symbol, limit=limit)
         return {"status": "ok", "count": len(data), "data": data}
     except Exception as exc:
         logger.exception("Failed to fetch snapshots for %s", symbol)
@@ -186,19 +340,20 @@ class BacktestRequest(BaseModel):
 
 
 @app.post("/backtest/{ticker}", tags=["Backtest"], summary="Chạy backtest AI strategy")
-async def run_backtest_api(ticker: str, req: BacktestRequest):
+async def run_backtest_api(ticker: SymbolPath, req: BacktestRequest):
     """Run a backtest for a ticker using AI-powered signals on historical data.
 
     **signal_mode**: Uses DeepSeek R1 to analyze SMC/Elliott/Wyckoff signals (low cost).
     **agent_mode**: Runs full Claude LangGraph pipeline (higher cost).
     """
-    ticker = ticker.upper()
     logger.info("📊 Backtest request: %s (%s→%s) mode=%s", ticker, req.start_date, req.end_date, req.mode)
 
     try:
         from backtesting.runner import run_backtest
 
-        result = run_backtest(
+        # Sync (drives the agent on its own event loop) – keep it off this one
+        result = await asyncio.to_thread(
+            run_backtest,
             ticker=ticker,
             start_date=req.start_date,
             end_date=req.end_date,
@@ -1,5 +1,23 @@
-from typing import TypedDict, List, Optional
-from pydantic import BaseModel, Field
+import operator
+import sys
+from dataclasses import dataclass
+from typing import Annotated, TypedDict, List, Optional
+
+import numpy as np
+from numba import njit
+from pydantic import AfterValidator, BaseModel, Field, StringConstraints
+
+# --- MÃ CỔ PHIẾU ---
+def _normalize_symbol(value: str) -> str:
+    """Chuẩn hoá mã về chữ in hoa, intern để so sánh / làm key rẻ hơn."""
+    return sys.intern(value.upper())
+
+# Mã hợp lệ (VNM, FPT, chứng quyền CVNM2301...), chuẩn hoá ngay khi parse
+Symbol = Annotated[
+    str,
+    StringConstraints(pattern=r"^[A-Za-z0-9]{3,10}$"),
+    AfterValidator(_normalize_symbol),
+]
 
 # --- THÀNH PHẦN CỦA ĐỊNH GIÁ ---
 class FinancialAnalysis(BaseModel):
@@ -17,6 +35,15 @@ class TechnicalSignals(BaseModel):
     support_zone: str = Field(description="Vùng hỗ trợ gần nhất")
     resistance_zone: str = Field(description="Vùng kháng cự gần nhất")
 
+# --- OUTPUT CỦA ANALYST (schema cho tool emit_analysis) ---
+class AnalystOutput(BaseModel):
+    """Kết quả phân tích tổng hợp mà Analyst trả về qua tool-use."""
+    financial_analysis: FinancialAnalysis
+    technical_signals: TechnicalSignals
+    smc_analysis: Optional[dict] = Field(default=None, description="Tóm tắt SMC: trend, CHoCH, Order Blocks, FVG")
+    elliott_analysis: Optional[dict] = Field(default=None, description="Tóm tắt Elliott: cấu trúc, sóng hiện tại, mục tiêu Fibonacci, invalidation")
+    wyckoff_analysis: Optional[dict] = Field(default=None, description="Tóm tắt Wyckoff: phase, POC, Value Area, Trading Range")
+
 # --- KỊCH BẢN ĐẦU TƯ ---
 class ScenarioDetail(BaseModel):
     """Chi tiết một kịch bản đầu tư (Bullish / Base / Bearish)."""
@@ -49,10 +76,11 @@ class AgentState(TypedDict):
     current_price: float
     mode: str  # "agent_mode" (Claude) | "signal_mode" (DeepSeek R1)
     
-    # Raw Data từ các Tool
-    raw_financials: dict
-    raw_news: List[str]
-    raw_ohlc: dict
+    # Raw Data từ các Tool — ghi song song bởi các nhánh fetch_*,
+    # reducer đảm bảo merge xác định khi các nhánh cùng hoàn tất
+    raw_financials: Annotated[dict, operator.or_]
+    raw_news: Annotated[List[str], operator.add]
+    raw_ohlc: Annotated[dict, operator.or_]
     
     # Phân tích có cấu trúc từ LLM
     financial_analysis: Optional[FinancialAnalysis]
@@ -69,6 +97,7 @@ class AgentState(TypedDict):
     current_strategy: Optional[InvestmentStrategy]
     daily_delta_note: Optional[str]      # Ghi chú về biến động trong ngày
     final_message: str                   # Nội dung gửi cho User qua Telegram
+    pending_db_writes: List[dict]        # Thesis rows (kwargs của crud.upsert_thesis) chờ ghi DB
 
 
 # --- DAILY FOLLOW-UP STATE ---
@@ -89,3 +118,76 @@ class DailyFollowUpState(TypedDict):
     # Output
     action_signal: str  # BUY_MORE, HOLD, SELL, WATCH
     ai_commentary: str
+
+
+@njit(cache=True)
+def _classify(close, stop, entry_min, entry_max, target, out):
+    """Decision kernel for ``DailyBatch.decide`` – codes as in DailyBatch.
+
+    No fastmath: the rules rely on NaN comparisons being False.
+    """
+    for i in range(close.shape[0]):
+        c = close[i]
+        if c <= stop[i]:
+            out[i] = 1    # HIT_STOP
+        elif entry_min[i] <= c <= entry_max[i]:
+            out[i] = 2    # IN_ENTRY
+        elif c >= target[i]:
+            out[i] = 3    # ABOVE_TARGET
+        else:
+            out[i] = 0    # HOLD
+
+
+@dataclass(slots=True)
+class DailyBatch:
+    """Columnar (SoA) view of one daily follow-up run – slot ``i`` is ``symbols[i]``.
+
+    Levels are NaN when absent (NaN comparisons are False, so a missing
+    level never fires).  ``decide`` runs the stop / entry / target checks
+    for every symbol at once.
+    """
+    symbols: List[str]
+    close: np.ndarray
+    volume: np.ndarray
+    change_pct: np.ndarray
+    target: np.ndarray
+    stop: np.ndarray
+    entry_min: np.ndarray
+    entry_max: np.ndarray
+
+    # Decision codes (first matching rule wins, like the if/elif chain)
+    HOLD = 0
+    HIT_STOP = 1
+    IN_ENTRY = 2
+    ABOVE_TARGET = 3
+
+    @classmethod
+    def from_rows(cls, rows: List[dict]) -> "DailyBatch":
+        """Build the batch from per-symbol dicts with the field names above."""
+        def col(name: str) -> np.ndarray:
+            return np.array([row[name] for row in rows], dtype=np.float64)
+
+        return cls(
+            symbols=[row["symbol"] for row in rows],
+            close=col("close"),
+            volume=col("volume"),
+            change_pct=col("change_pct"),
+            target=col("target"),
+            stop=col("stop"),
+            entry_min=col("entry_min"),
+            entry_max=col("entry_max"),
+        )
+
+    def decide(self) -> np.ndarray:
+        """Decision code per symbol (``HOLD`` / ``HIT_STOP`` / ``IN_ENTRY`` / ``ABOVE_TARGET``), int8."""
+        out = np.empty(len(self.symbols), dtype=np.int8)
+        _classify(self.close, self.stop, self.entry_min, self.entry_max, self.target, out)
+        return out
+
+    @classmethod
+    def warm_up(cls) -> None:
+        """JIT-compile the decision kernel ahead of the first real run."""
+        cls.from_rows([
+            {"symbol": "", "close": 1.0, "volume": 0.0, "change_pct": 0.0,
+             "target": np.nan, "stop": np.nan, "entry_min": np.nan, "entry_max": np.nan},
+        ]).decide()
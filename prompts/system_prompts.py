@@ -1,5 +1,7 @@
 """System prompts repository for the AI Stock Copilot."""
 
+import sys
+
 # ─────────────────────────────────────────────────────────────────────────────
 # SUPER SYSTEM PROMPT — On-demand deep analysis
 # ─────────────────────────────────────────────────────────────────────────────
@@ -333,3 +335,9 @@ Chỉ trả về JSON (không kèm text khác) với cấu trúc:
     }}
 }}
 """
+
+
+# Interned: one shared object per prompt for the life of the process
+ANALYSIS_SYSTEM_PROMPT = sys.intern(ANALYSIS_SYSTEM_PROMPT)
+DAILY_FOLLOWUP_PROMPT = sys.intern(DAILY_FOLLOWUP_PROMPT)
+ANALYST_PROMPT = sys.intern(ANALYST_PROMPT)
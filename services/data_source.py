@@ -0,0 +1,36 @@
+"""Market-data source used by the agent pipeline.
+
+Nodes and tools read prices & financials through ``get_data_service()``,
+which is the live ``vnstock_service`` module unless a backtest has bound its
+point-in-time ``VnstockBacktestService`` with ``use_data_service``.
+
+The binding lives in a ContextVar, so it follows the asyncio tasks,
+``asyncio.to_thread`` calls and LangChain tool executors of that one
+pipeline run – concurrent live requests (or another backtest) keep their
+own source.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from services import vnstock_service
+
+_data_service: ContextVar[Any] = ContextVar("data_service", default=vnstock_service)
+
+
+def get_data_service() -> Any:
+    """Return the data service bound to the current context."""
+    return _data_service.get()
+
+
+@contextmanager
+def use_data_service(service: Any) -> Iterator[None]:
+    """Bind ``service`` as the data source for code run inside the block."""
+    token = _data_service.set(service)
+    try:
+        yield
+    finally:
+        _data_service.reset(token)
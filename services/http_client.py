@@ -0,0 +1,70 @@
+"""Shared HTTP clients – one keep-alive connection pool per event loop.
+
+Telegram and news calls reuse these instead of opening a client (TCP + TLS
+handshake) per request.  The async client is HTTP/2, so concurrent Telegram
+calls multiplex over a single connection.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+
+import httpx
+
+_TIMEOUT = 15
+_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+
+# An AsyncClient's pool is bound to the loop it first ran on, so each loop
+# gets its own.  Weak keys: a finished loop does not stay pinned by its entry.
+_async_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, httpx.AsyncClient
+] = weakref.WeakKeyDictionary()
+_async_lock = threading.Lock()
+
+_sync_client: httpx.Client | None = None
+_sync_lock = threading.Lock()
+
+
+def get_http() -> httpx.AsyncClient:
+    """Return the running loop's ``httpx.AsyncClient`` (created lazily).
+
+    The FastAPI loop keeps one for the app's lifetime; code that drives
+    coroutines on its own loop (the backtest) must ``await aclose_loop()``
+    before that loop is closed.
+    """
+    loop = asyncio.get_running_loop()
+    with _async_lock:
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(http2=True, timeout=_TIMEOUT, limits=_LIMITS)
+            _async_clients[loop] = client
+        return client
+
+
+def get_http_sync() -> httpx.Client:
+    """Return the shared thread-safe ``httpx.Client`` (created lazily)."""
+    global _sync_client
+    with _sync_lock:
+        if _sync_client is None or _sync_client.is_closed:
+            _sync_client = httpx.Client(timeout=_TIMEOUT, limits=_LIMITS)
+        return _sync_client
+
+
+async def aclose_loop() -> None:
+    """Close the running loop's async client, if it created one."""
+    with _async_lock:
+        client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def aclose() -> None:
+    """Close this loop's async client and the sync client (app shutdown)."""
+    global _sync_client
+    await aclose_loop()
+    with _sync_lock:
+        if _sync_client is not None:
+            _sync_client.close()
+            _sync_client = None
@@ -2,15 +2,25 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any
+import re
+import threading
+import unicodedata
+import xml.etree.ElementTree as ET
+from functools import lru_cache
 
-import httpx
+from cachetools import TTLCache
+
+from services.http_client import get_http, get_http_sync
 
 logger = logging.getLogger(__name__)
 
-# Google Custom Search fallback / simple scrape approach
-_SEARCH_URL = "https://www.google.com/search"
+# Business / stock-market RSS feeds (a few KB of XML each)
+_FEEDS = [
+    "https://vnexpress.net/rss/kinh-doanh.rss",
+    "https://cafef.vn/thi-truong-chung-khoan.rss",
+]
 _HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -19,77 +29,144 @@ _HEADERS = {
     )
 }
 
+# Parsed feed items per URL – every ticker is filtered from the same fetch
+_feed_cache: TTLCache = TTLCache(maxsize=len(_FEEDS), ttl=300)
+_feed_cache_lock = threading.Lock()
+
+# Headlines per (ticker, limit); "no news" results expire sooner so a
+# transient feed failure doesn't stick
+_result_cache: TTLCache = TTLCache(maxsize=256, ttl=600)
+_miss_cache: TTLCache = TTLCache(maxsize=256, ttl=60)
+_result_cache_lock = threading.Lock()
+
 
 async def search_news(ticker: str, limit: int = 5) -> list[str]:
     """Return a list of recent news headline strings for the given ticker.
 
-    Uses a simple web search approach.  Replace with a proper News API
-    (e.g., Google News API, NewsData.io, or VNExpress RSS) for production.
+    Headlines come from the VNExpress / CafeF RSS feeds, keeping items whose
+    title or summary mentions the ticker.  Results are cached for 10 min
+    (1 min when nothing was found).
     """
-    query = f"{ticker} cổ phiếu chứng khoán Việt Nam tin tức"
-    headlines: list[str] = []
+    key = (ticker.upper(), limit)
+    cached = _get_cached(key)
+    if cached is not None:
+        return cached
 
-    try:
-        async with httpx.AsyncClient(timeout=15, follow_redirects=True) as client:
-            resp = await client.get(
-                _SEARCH_URL,
-                params={"q": query, "num": limit, "hl": "vi"},
-                headers=_HEADERS,
-            )
-            resp.raise_for_status()
+    results = await asyncio.gather(*(_fetch_feed(url) for url in _FEEDS), return_exceptions=True)
 
-            # Very simple HTML title extraction – not a full parser
-            text = resp.text
-            headlines = _extract_titles(text, limit)
+    items: list[tuple[str, str]] = []
+    for url, res in zip(_FEEDS, results):
+        if isinstance(res, Exception):
+            logger.warning("News feed %s failed for %s: %s", url, ticker, res)
+            continue
+        items.extend(res)
 
-    except Exception as exc:
-        logger.warning("News search failed for %s: %s", ticker, exc)
-
-    if not headlines:
-        headlines = [f"Không tìm thấy tin tức mới cho {ticker}."]
-
-    return headlines
+    return _store_result(key, _filter_headlines(items, ticker, limit))
 
 
 def search_news_sync(ticker: str, limit: int = 5) -> list[str]:
-    """Synchronous wrapper for search_news."""
-    query = f"{ticker} cổ phiếu chứng khoán Việt Nam tin tức"
-    headlines: list[str] = []
+    """Synchronous version of search_news (shares the same caches)."""
+    key = (ticker.upper(), limit)
+    cached = _get_cached(key)
+    if cached is not None:
+        return cached
+
+    items: list[tuple[str, str]] = []
+    for url in _FEEDS:
+        try:
+            items.extend(_fetch_feed_sync(url))
+        except Exception as exc:
+            logger.warning("News feed %s failed for %s: %s", url, ticker, exc)
+
+    return _store_result(key, _filter_headlines(items, ticker, limit))
+
+
+def _get_cached(key: tuple[str, int]) -> list[str] | None:
+    with _result_cache_lock:
+        cached = _result_cache.get(key)
+        if cached is None:
+            cached = _miss_cache.get(key)
+    return list(cached) if cached is not None else None
+
+
+def _store_result(key: tuple[str, int], headlines: list[str]) -> list[str]:
+    """Cache ``headlines`` (or the "no news" fallback) and return it."""
+    with _result_cache_lock:
+        if headlines:
+            _result_cache[key] = headlines
+        else:
+            headlines = [f"Không tìm thấy tin tức mới cho {key[0]}."]
+            _miss_cache[key] = headlines
+    return list(headlines)
+
+
+async def _fetch_feed(url: str) -> list[tuple[str, str]]:
+    """Return the ``(title, description)`` items of a feed (cached 5 min)."""
+    with _feed_cache_lock:
+        cached = _feed_cache.get(url)
+    if cached is not None:
+        return cached
+
+    resp = await get_http().get(url, headers=_HEADERS, follow_redirects=True)
+    resp.raise_for_status()
+    items = _parse_feed(resp.content)
+    with _feed_cache_lock:
+        _feed_cache[url] = items
+    return items
+
+
+def _fetch_feed_sync(url: str) -> list[tuple[str, str]]:
+    """Synchronous version of _fetch_feed (shares the same cache)."""
+    with _feed_cache_lock:
+        cached = _feed_cache.get(url)
+    if cached is not None:
+        return cached
+
+    resp = get_http_sync().get(url, headers=_HEADERS, follow_redirects=True)
+    resp.raise_for_status()
+    items = _parse_feed(resp.content)
+    with _feed_cache_lock:
+        _feed_cache[url] = items
+    return items
+
+
+def _parse_feed(xml: bytes) -> list[tuple[str, str]]:
+    """Extract ``(title, description)`` of every ``<item>`` in an RSS document."""
+    root = ET.fromstring(xml)
+    return [
+        ((item.findtext("title") or "").strip(), item.findtext("description") or "")
+        for item in root.iter("item")
+    ]
+
+
+def _filter_headlines(items: list[tuple[str, str]], ticker: str, limit: int) -> list[str]:
+    """Up to ``limit`` unique titles mentioning ``ticker`` as a whole word.
+
+    Matching ignores case and Vietnamese diacritics ("Đ" counts as "D").
+    """
+    pattern = _ticker_pattern(_fold(ticker))
 
-    try:
-        with httpx.Client(timeout=15, follow_redirects=True) as client:
-            resp = client.get(
-                _SEARCH_URL,
-                params={"q": query, "num": limit, "hl": "vi"},
-                headers=_HEADERS,
-            )
-            resp.raise_for_status()
-            headlines = _extract_titles(resp.text, limit)
+    headlines: list[str] = []
+    for title, description in items:
+        if title and title not in headlines and (
+            pattern.search(_fold(title)) or pattern.search(_fold(description))
+        ):
+            headlines.append(title)
+            if len(headlines) >= limit:
+                break
+    return headlines
 
-    except Exception as exc:
-        logger.warning("News search failed for %s: %s", ticker, exc)
 
-    if not headlines:
-        headlines = [f"Không tìm thấy tin tức mới cho {ticker}."]
+@lru_cache(maxsize=512)
+def _ticker_pattern(ticker: str) -> re.Pattern[str]:
+    """Whole-word regex for a (folded) ticker, compiled once per symbol."""
+    return re.compile(rf"\b{re.escape(ticker)}\b")
 
-    return headlines
 
+_FOLD_TABLE = str.maketrans("Đđ", "Dd")
 
-def _extract_titles(html: str, limit: int) -> list[str]:
-    """Extract up to `limit` text snippets from search results HTML.
 
-    This is intentionally simple. For production, use a proper API or
-    BeautifulSoup / lxml.
-    """
-    import re
-
-    titles: list[str] = []
-    # Pattern to extract <h3> content (Google search result titles)
-    pattern = re.compile(r"<h3[^>]*>(.*?)</h3>", re.DOTALL)
-    for match in pattern.finditer(html):
-        text = re.sub(r"<[^>]+>", "", match.group(1)).strip()
-        if text and len(text) > 10:
-            titles.append(text)
-            if len(titles) >= limit:
-                break
-    return titles
+def _fold(text: str) -> str:
+    """Lower-case ``text`` with diacritics removed, for matching."""
+    decomposed = unicodedata.normalize("NFD", text.translate(_FOLD_TABLE))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
@@ -2,29 +2,70 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 
 import httpx
+import orjson
 
-from config import get_settings
+from config import settings
+from services.http_client import get_http, get_http_sync
 
 logger = logging.getLogger(__name__)
 
 _BASE_URL = "https://api.telegram.org/bot{token}"
 
+# Resolved once at import (settings are loaded at import too)
+_ENABLED = bool(settings.telegram_bot_token and settings.telegram_chat_id)
+_CHAT_ID = settings.telegram_chat_id
+
+# Telegram allows roughly one edit per second per chat
+_EDIT_INTERVAL_S = 1.0
+
+_DIVIDER = "─" * 30
+_REPORT_HEADER_TMPL = f"📊 *Báo cáo phân tích: {{ticker}}*\n{_DIVIDER}\n\n"
+
 
 def _api_url(method: str) -> str:
-    settings = get_settings()
     return f"{_BASE_URL.format(token=settings.telegram_bot_token)}/{method}"
 
 
+_SEND_URL = _api_url("sendMessage")
+_EDIT_URL = _api_url("editMessageText")
+
+
+class RateLimiter:
+    """Spaces Telegram API calls on one event loop ``interval`` seconds apart."""
+
+    def __init__(self, interval: float) -> None:
+        self._interval = interval
+        self._lock = asyncio.Lock()
+        self._next_at = 0.0
+
+    async def wait(self) -> None:
+        """Sleep until the next call is allowed, then reserve its slot."""
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            delay = self._next_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_at = loop.time() + self._interval
+
+
+def _json_body(payload: dict) -> dict:
+    """httpx request kwargs for a JSON body encoded with orjson."""
+    return {"content": orjson.dumps(payload), "headers": {"Content-Type": "application/json"}}
+
+
 async def send_message(text: str, parse_mode: str = "Markdown") -> bool:
     """Send a text message to the configured Telegram chat.
 
+    Chunks of a long message go out one after another, so they arrive in
+    order; only the first one notifies.
+
     Returns True on success.
     """
-    settings = get_settings()
-    if not settings.telegram_bot_token or not settings.telegram_chat_id:
+    if not _ENABLED:
         logger.warning("Telegram credentials not configured – skipping send.")
         return False
 
@@ -33,19 +74,20 @@ async def send_message(text: str, parse_mode: str = "Markdown") -> bool:
     success = True
 
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            for chunk in chunks:
-                resp = await client.post(
-                    _api_url("sendMessage"),
-                    json={
-                        "chat_id": settings.telegram_chat_id,
-                        "text": chunk,
-                        "parse_mode": parse_mode,
-                    },
-                )
-                if resp.status_code != 200:
-                    logger.error("Telegram API error: %s", resp.text)
-                    success = False
+        client = get_http()
+        for i, chunk in enumerate(chunks):
+            resp = await client.post(
+                _SEND_URL,
+                **_json_body({
+                    "chat_id": _CHAT_ID,
+                    "text": chunk,
+                    "parse_mode": parse_mode,
+                    "disable_notification": i > 0,
+                }),
+            )
+            if resp.status_code != 200:
+                logger.error("Telegram API error: %s", resp.text)
+                success = False
     except Exception as exc:
         logger.exception("Failed to send Telegram message: %s", exc)
         return False
@@ -55,8 +97,7 @@ async def send_message(text: str, parse_mode: str = "Markdown") -> bool:
 
 def send_message_sync(text: str, parse_mode: str = "Markdown") -> bool:
     """Synchronous version of send_message."""
-    settings = get_settings()
-    if not settings.telegram_bot_token or not settings.telegram_chat_id:
+    if not _ENABLED:
         logger.warning("Telegram credentials not configured – skipping send.")
         return False
 
@@ -64,19 +105,19 @@ def send_message_sync(text: str, parse_mode: str = "Markdown") -> bool:
     success = True
 
     try:
-        with httpx.Client(timeout=15) as client:
-            for chunk in chunks:
-                resp = client.post(
-                    _api_url("sendMessage"),
-                    json={
-                        "chat_id": settings.telegram_chat_id,
-                        "text": chunk,
-                        "parse_mode": parse_mode,
-                    },
-                )
-                if resp.status_code != 200:
-                    logger.error("Telegram API error: %s", resp.text)
-                    success = False
+        client = get_http_sync()
+        for chunk in chunks:
+            resp = client.post(
+                _SEND_URL,
+                **_json_body({
+                    "chat_id": _CHAT_ID,
+                    "text": chunk,
+                    "parse_mode": parse_mode,
+                }),
+            )
+            if resp.status_code != 200:
+                logger.error("Telegram API error: %s", resp.text)
+                success = False
     except Exception as exc:
         logger.exception("Failed to send Telegram message: %s", exc)
         return False
@@ -86,31 +127,126 @@ def send_message_sync(text: str, parse_mode: str = "Markdown") -> bool:
 
 async def send_report(ticker: str, report: str) -> bool:
     """Format and send an analysis report for a specific ticker."""
-    header = f"📊 *Báo cáo phân tích: {ticker}*\n{'─' * 30}\n\n"
+    header = _REPORT_HEADER_TMPL.format(ticker=ticker)
     return await send_message(header + report)
 
 
 def send_report_sync(ticker: str, report: str) -> bool:
     """Synchronous version of send_report."""
-    header = f"📊 *Báo cáo phân tích: {ticker}*\n{'─' * 30}\n\n"
+    header = _REPORT_HEADER_TMPL.format(ticker=ticker)
     return send_message_sync(header + report)
 
 
+async def stream_report(ticker: str, queue: asyncio.Queue, limiter: RateLimiter) -> str:
+    """Stream a report to Telegram while the LLM is still writing it.
+
+    Consumes text deltas from ``queue`` until a ``None`` sentinel.  The
+    message is created on the first delta and then updated in place with
+    ``editMessageText`` (at most every ``_EDIT_INTERVAL_S``); text past the
+    4096-char limit continues in follow-up messages.  Partial Markdown does
+    not parse, so intermediate edits are plain text and only the final edit
+    uses Markdown.  Every call waits on ``limiter``, shared with the other
+    Telegram sends.
+
+    Returns the text shown in the chat ("" if nothing was sent) – the
+    caller sends the final report itself when it differs.
+    """
+    if not _ENABLED:
+        logger.warning("Telegram credentials not configured – skipping send.")
+        return ""
+
+    header = _REPORT_HEADER_TMPL.format(ticker=ticker)
+    loop = asyncio.get_running_loop()
+    text = ""
+    message_ids: list[int] = []
+    shown: list[str] = []
+    last_flush = 0.0
+
+    try:
+        client = get_http()
+
+        async def flush(parse_mode: str | None) -> bool:
+            for i, chunk in enumerate(_split_message(header + text, max_len=4000)):
+                if i == len(message_ids):
+                    await limiter.wait()
+                    message_id = await _post_message(client, chunk, parse_mode)
+                    if message_id is None:
+                        return False
+                    message_ids.append(message_id)
+                    shown.append(chunk)
+                elif chunk != shown[i] or parse_mode:
+                    await limiter.wait()
+                    await _edit_message(client, message_ids[i], chunk, parse_mode)
+                    shown[i] = chunk
+            return True
+
+        while (delta := await queue.get()) is not None:
+            text += delta
+            if loop.time() - last_flush >= _EDIT_INTERVAL_S:
+                await flush(None)
+                last_flush = loop.time()
+
+        if text and not await flush("Markdown"):
+            return ""
+    except Exception as exc:
+        logger.exception("Failed to stream Telegram report: %s", exc)
+        return ""
+
+    return text if message_ids else ""
+
+
+async def _post_message(client: httpx.AsyncClient, text: str, parse_mode: str | None) -> int | None:
+    """sendMessage; returns the new message_id (None on failure)."""
+    payload = {"chat_id": _CHAT_ID, "text": text}
+    if parse_mode:
+        payload["parse_mode"] = parse_mode
+    resp = await client.post(_SEND_URL, **_json_body(payload))
+    if resp.status_code != 200:
+        logger.error("Telegram API error: %s", resp.text)
+        return None
+    return resp.json()["result"]["message_id"]
+
+
+async def _edit_message(
+    client: httpx.AsyncClient, message_id: int, text: str, parse_mode: str | None
+) -> bool:
+    """editMessageText; a failed Markdown edit leaves the plain text in place."""
+    payload = {"chat_id": _CHAT_ID, "message_id": message_id, "text": text}
+    if parse_mode:
+        payload["parse_mode"] = parse_mode
+    resp = await client.post(_EDIT_URL, **_json_body(payload))
+    if resp.status_code != 200:
+        logger.warning("Telegram edit failed: %s", resp.text)
+        return False
+    return True
+
+
 def _split_message(text: str, max_len: int = 4000) -> list[str]:
-    """Split a long message into chunks that fit Telegram's limit."""
+    """Split a long message into chunks that fit Telegram's limit.
+
+    Walks cut indices over the original string, so each chunk is sliced
+    exactly once (no copy of the remaining text per chunk).  ``max_len``
+    counts characters, like Telegram does – not UTF-8 bytes.
+    """
     if len(text) <= max_len:
         return [text]
 
     chunks: list[str] = []
-    while text:
-        if len(text) <= max_len:
-            chunks.append(text)
+    start, n = 0, len(text)
+    while start < n:
+        end = start + max_len
+        if end >= n:
+            chunks.append(text[start:])
             break
         # Try to split at a newline near the limit
-        split_idx = text.rfind("\n", 0, max_len)
-        if split_idx == -1:
-            split_idx = max_len
-        chunks.append(text[:split_idx])
-        text = text[split_idx:].lstrip("\n")
+        split_idx = text.rfind("\n", start, end)
+        if split_idx <= start:
+            # No newline in the window (or only at its start) – hard cut
+            split_idx = end
+        chunks.append(text[start:split_idx])
+        # Skip the newline(s) at the cut
+        start = split_idx
+        while start < n and text[start] == "\n":
+            start += 1
 
     return chunks
@@ -14,8 +14,7 @@ import numpy as np
 import pandas as pd
 
 from backtesting.lookback_provider import LookbackProvider
-# Import the REAL function at module-load time — before any monkey-patching.
-# This reference survives monkey-patching of vnstock_service module attributes.
+# The indicator maths is identical offline – reuse the live implementation
 from services.vnstock_service import calculate_technical_indicators as _real_calc_tech
 
 logger = logging.getLogger(__name__)
@@ -65,8 +64,7 @@ class VnstockBacktestService:
     def calculate_technical_indicators(self, df: pd.DataFrame) -> dict[str, Any]:
         """Compute indicators on the given (already-sliced) DataFrame.
 
-        Uses the real ``vnstock_service`` logic (imported at module load
-        time, so it survives monkey-patching).
+        Uses the real ``vnstock_service`` logic.
         """
         return _real_calc_tech(df)
 
@@ -3,15 +3,81 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timedelta
+import threading
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from pathlib import Path
 from typing import Any
+from zoneinfo import ZoneInfo
 
 import numpy as np
 import pandas as pd
+from cachetools import TTLCache
+from diskcache import Cache
+from numba import njit
 from vnstock import Vnstock
 
 logger = logging.getLogger(__name__)
 
+# Quarterly statements change a few times a year; one fetch per job is plenty.
+# get_financial_ratios and get_income_statement share the income statement.
+_finance_cache: TTLCache = TTLCache(maxsize=512, ttl=3600)
+_finance_cache_lock = threading.Lock()
+
+
+# Price history on disk, so `worker.py --once` re-runs and restarts skip the
+# 365-day download.  Keyed by trading date; short TTL while the market is open.
+_PRICE_CACHE_DIR = Path(__file__).parent.parent / ".cache" / "vnstock"
+_VN_TZ = ZoneInfo("Asia/Ho_Chi_Minh")
+_MARKET_HOURS = (time(9, 0), time(15, 0))
+_PRICE_TTL_OPEN_S = 300
+
+
+def _price_cache_ttl(now: datetime) -> int:
+    """Seconds a price fetch at `now` stays fresh.
+
+    5 min while the market is open; otherwise until the next session opens,
+    so a pre-open fetch is refreshed at 09:00 instead of serving all day.
+    """
+    open_t, close_t = _MARKET_HOURS
+    if now.weekday() < 5 and open_t <= now.time() < close_t:
+        return _PRICE_TTL_OPEN_S
+    day = now.date() if now.time() < open_t else now.date() + timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    next_open = datetime.combine(day, open_t, tzinfo=_VN_TZ)
+    return max(int((next_open - now).total_seconds()), _PRICE_TTL_OPEN_S)
+
+
+@lru_cache(maxsize=1)
+def _price_cache() -> Cache:
+    """Return the on-disk price cache (opened on first use)."""
+    return Cache(str(_PRICE_CACHE_DIR))
+
+
+@lru_cache(maxsize=256)
+def _get_stock(ticker: str):
+    """Return the (reused) VCI ``stock`` handle for a ticker."""
+    return Vnstock().stock(symbol=ticker, source="VCI")
+
+
+def _get_finance_report(ticker: str, report: str, period: str = "quarter") -> pd.DataFrame | None:
+    """Fetch ``stock.finance.<report>`` (``ratio`` / ``income_statement``), cached 1 h.
+
+    Empty results are not cached so a transient API hiccup is retried.
+    """
+    key = (ticker, report, period)
+    with _finance_cache_lock:
+        cached = _finance_cache.get(key)
+    if cached is not None:
+        return cached
+
+    df = getattr(_get_stock(ticker).finance, report)(period=period, lang="en")
+    if df is not None and not df.empty:
+        with _finance_cache_lock:
+            _finance_cache[key] = df
+    return df
+
 
 def _flatten_columns(df: pd.DataFrame) -> pd.DataFrame:
     """Flatten MultiIndex columns to plain strings.
@@ -20,18 +86,32 @@ def _flatten_columns(df: pd.DataFrame) -> pd.DataFrame:
     ('ROE', 'Q1 2024') which break json serialization.
     """
     if isinstance(df.columns, pd.MultiIndex):
-        df = df.copy()
-        df.columns = ["_".join(str(c) for c in col).strip("_") for col in df.columns]
-    else:
+        new_cols = ["_".join(str(c) for c in col).strip("_") for col in df.columns]
+    elif any(not isinstance(c, str) for c in df.columns):
         # Even single-level columns can be tuples in some pandas versions
-        df = df.copy()
-        df.columns = [str(c) for c in df.columns]
+        new_cols = [str(c) for c in df.columns]
+    else:
+        return df
+    # Shallow copy: new column labels, shared data blocks (no O(rows·cols) copy)
+    df = df.copy(deep=False)
+    df.columns = new_cols
     return df
 
 
 # ── Financial data ───────────────────────────────────────────────────────────
 
 
+# Column allowlists for get_financial_ratios (substrings of lowered labels).
+# Each covers every keyword its column finders use, so projecting first
+# never changes which column is picked.
+_PERIOD_COLUMNS = ("ticker", "year", "quarter", "period", "length")
+_RATIO_COLUMNS = (*_PERIOD_COLUMNS, "roe", "p/e", "pe", "debt", "equity")
+_INCOME_COLUMNS = (
+    *_PERIOD_COLUMNS, "revenue", "net sales", "doanh thu",
+    "profit", "parent company", "lợi nhuận", "loi nhuan",
+)
+
+
 def get_financial_ratios(ticker: str, periods: int = 8) -> dict[str, Any]:
     """Fetch key financial ratios (quarterly) for the given ticker.
 
@@ -39,91 +119,68 @@ def get_financial_ratios(ticker: str, periods: int = 8) -> dict[str, Any]:
     debt_to_equity, raw_ratios (DataFrame as dict).
     """
     try:
-        stock = Vnstock().stock(symbol=ticker, source="VCI")
-        finance = stock.finance
-
         # Quarterly financial ratios
-        ratios = finance.ratio(period="quarter", lang="en")
+        ratios = _get_finance_report(ticker, "ratio")
         if ratios is None or ratios.empty:
             return {"error": f"No financial ratio data found for {ticker}"}
 
-        # Flatten MultiIndex columns & limit to recent periods
+        # Keep only the columns read below, flatten MultiIndex columns &
+        # limit to recent periods
         # NOTE: vnstock returns data sorted DESCENDING (newest first),
         # so .head() gives the most recent rows.
-        ratios = _flatten_columns(ratios).head(periods)
-
-        # Income statement for growth calculation
-        income = finance.income_statement(period="quarter", lang="en")
-        if income is not None and not income.empty:
-            income = _flatten_columns(income).head(periods)
-
+        ratios = _flatten_columns(_project_columns(ratios, _RATIO_COLUMNS)).head(periods)
+
+        # ROE, P/E & Debt-to-Equity columns in one pass over lowered names
+        ratio_idx = _col_index(ratios)
+        roe_col = pe_col = de_col = None
+        for col_lower, col in ratio_idx:
+            if roe_col is None and "roe" in col_lower:
+                roe_col = col
+            if pe_col is None and ("p/e" in col_lower or "pe" in col_lower):
+                pe_col = col
+            if de_col is None and "debt" in col_lower and "equity" in col_lower:
+                de_col = col
+
+        # Latest metrics = first row (newest), converted together; 0 if missing
+        metric_cols = {"roe": roe_col, "pe_ratio": pe_col, "debt_to_equity": de_col}
+        found = {key: col for key, col in metric_cols.items() if col is not None}
+
+        # raw_ratios (LLM context): period labels + the three metrics only
+        keep = [
+            col for col_lower, col in ratio_idx
+            if col in found.values() or any(kw in col_lower for kw in _PERIOD_COLUMNS)
+        ]
         result: dict[str, Any] = {
             "ticker": ticker,
-            "raw_ratios": ratios.to_dict(orient="records"),
+            "raw_ratios": ratios[keep].to_dict(orient="records"),
         }
-
-        # Extract latest metrics from ratios (first row = newest)
-        latest = ratios.iloc[0] if not ratios.empty else {}
-
-        # ROE
-        for col in ratios.columns:
-            col_lower = str(col).lower()
-            if "roe" in col_lower:
-                result["roe"] = float(latest.get(col, 0))
-                break
-        else:
-            result["roe"] = 0.0
-
-        # P/E
-        for col in ratios.columns:
-            col_lower = str(col).lower()
-            if "p/e" in col_lower or "pe" in col_lower:
-                result["pe_ratio"] = float(latest.get(col, 0))
-                break
-        else:
-            result["pe_ratio"] = 0.0
-
-        # Debt-to-Equity
-        for col in ratios.columns:
-            col_lower = str(col).lower()
-            if "debt" in col_lower and "equity" in col_lower:
-                result["debt_to_equity"] = float(latest.get(col, 0))
-                break
-        else:
-            result["debt_to_equity"] = 0.0
-
-        # Revenue & Profit growth (YoY from income statement)
-        if income is not None and len(income) >= 5:
+        result.update(dict.fromkeys((*metric_cols, "revenue_growth", "profit_growth"), 0.0))
+        if found:
+            latest = pd.to_numeric(ratios[list(found.values())].iloc[0], errors="coerce")
+            result.update(zip(found, latest.fillna(0.0).to_numpy(np.float64).tolist()))
+
+        # Revenue & Profit growth (YoY from income statement) – needs the
+        # same quarter last year, i.e. at least 5 rows after head(periods)
+        income = _get_finance_report(ticker, "income_statement")
+        if income is not None and min(len(income), periods) >= 5:
+            income = _flatten_columns(_project_columns(income, _INCOME_COLUMNS)).head(periods)
+            idx = _col_index(income)
             # Use specific column names to avoid matching "Revenue YoY (%)" etc.
-            rev_col = _find_column(income, ["revenue (bn", "net sales", "doanh thu thuần"])
+            rev_col = _match_column(idx, ["revenue (bn", "net sales", "doanh thu thuần"])
             if not rev_col:
-                rev_col = _find_column_exclude(income, ["revenue", "doanh thu"], exclude=["yoy", "%"])
-            profit_col = _find_column(income, ["net profit", "attributable to parent company (bn", "attribute to parent company (bn", "lợi nhuận ròng"])
+                rev_col = _match_column(idx, ["revenue", "doanh thu"], exclude=["yoy", "%"])
+            profit_col = _match_column(idx, ["net profit", "attributable to parent company (bn", "attribute to parent company (bn", "lợi nhuận ròng"])
             if not profit_col:
-                profit_col = _find_column_exclude(income, ["profit", "loi nhuan"], exclude=["yoy", "%", "margin"])
+                profit_col = _match_column(idx, ["profit", "loi nhuan"], exclude=["yoy", "%", "margin"])
 
-            # Data is sorted DESCENDING: iloc[0] = latest quarter,
-            # iloc[4] = same quarter last year
+            # Data is sorted DESCENDING: row 0 = latest quarter,
+            # row 4 = same quarter last year
             if rev_col:
-                current_rev = income[rev_col].iloc[0]
-                prev_rev = income[rev_col].iloc[4]  # same quarter last year
-                result["revenue_growth"] = (
-                    _safe_growth(current_rev, prev_rev)
-                )
-            else:
-                result["revenue_growth"] = 0.0
-
+                rev = income[rev_col].to_numpy()
+                result["revenue_growth"] = _safe_growth(rev[0], rev[4])
             if profit_col:
-                current_profit = income[profit_col].iloc[0]
-                prev_profit = income[profit_col].iloc[4]
-                result["profit_growth"] = (
-                    _safe_growth(current_profit, prev_profit)
-                )
-            else:
-                result["profit_growth"] = 0.0
-        else:
-            result["revenue_growth"] = 0.0
-            result["profit_growth"] = 0.0
+                profit = income[profit_col].to_numpy()
+                result["profit_growth"] = _safe_growth(profit[0], profit[4])
 
         return result
 
@@ -135,8 +192,7 @@ def get_financial_ratios(ticker: str, periods: int = 8) -> dict[str, Any]:
 def get_income_statement(ticker: str, periods: int = 8) -> dict[str, Any]:
     """Return recent income statement data as a list of dicts."""
     try:
-        stock = Vnstock().stock(symbol=ticker, source="VCI")
-        income = stock.finance.income_statement(period="quarter", lang="en")
+        income = _get_finance_report(ticker, "income_statement")
         if income is None or income.empty:
             return {"error": f"No income statement data for {ticker}"}
         return {"ticker": ticker, "data": _flatten_columns(income).tail(periods).to_dict(orient="records")}
@@ -151,16 +207,31 @@ def get_income_statement(ticker: str, periods: int = 8) -> dict[str, Any]:
 def get_price_history(
     ticker: str, days: int = 365
 ) -> pd.DataFrame | dict[str, str]:
-    """Return OHLCV DataFrame for the last `days` trading days."""
+    """Return OHLCV DataFrame for the last `days` trading days.
+
+    Disk-cached per (ticker, days, trading date): 5 min during market hours,
+    otherwise until the next market open.  Error dicts are never cached.
+    """
+    now = datetime.now(_VN_TZ)
+    today = now.date()
+    key = ("price_history", ticker, days, today.isoformat())
+    cached = _price_cache().get(key)
+    if cached is not None:
+        return cached
+
+    df = _fetch_price_history(ticker, days, today)
+    if isinstance(df, pd.DataFrame):
+        _price_cache().set(key, df, expire=_price_cache_ttl(now))
+    return df
+
+
+def _fetch_price_history(
+    ticker: str, days: int, today: date | None = None
+) -> pd.DataFrame | dict[str, str]:
+    """Download OHLCV for the last ``days`` calendar days (error dict on failure)."""
     try:
-        stock = Vnstock().stock(symbol=ticker, source="VCI")
-        end = datetime.now()
-        start = end - timedelta(days=days)
-
-        df = stock.quote.history(
-            start=start.strftime("%Y-%m-%d"),
-            end=end.strftime("%Y-%m-%d"),
-        )
+        start, end = _date_range(days, today)
+        df = _get_stock(ticker).quote.history(start=start, end=end)
         if df is None or df.empty:
             return {"error": f"No price data for {ticker}"}
         return _flatten_columns(df)
@@ -173,21 +244,7 @@ def get_price_history(
 def get_current_price(ticker: str) -> dict[str, Any]:
     """Return the latest close price and basic info."""
     try:
-        df = get_price_history(ticker, days=10)
-        if isinstance(df, dict):
-            return df  # error dict
-
-        latest = df.iloc[-1]
-
-        # Try to identify column names dynamically
-        close_col = _find_column(df, ["close"])
-        volume_col = _find_column(df, ["volume"])
-
-        close = float(latest[close_col]) if close_col else 0.0
-        volume = int(latest[volume_col]) if volume_col else 0
-
-        prev = df.iloc[-2] if len(df) >= 2 else latest
-        prev_close = float(prev[close_col]) if close_col else close
+        close, prev_close, volume = _get_last_two_closes(ticker)
         change_pct = ((close - prev_close) / prev_close * 100) if prev_close else 0.0
 
         return {
@@ -202,6 +259,43 @@ def get_current_price(ticker: str) -> dict[str, Any]:
         return {"error": str(exc)}
 
 
+def _get_last_two_closes(ticker: str) -> tuple[float, float, int]:
+    """``(close, prev_close, volume)`` of the two latest sessions.
+
+    Asks for 5 calendar days (enough over a weekend) and widens to 10 only
+    when that window holds fewer than two sessions (holidays).  Only three
+    cells are read, so the frame is not flattened.
+    """
+    stock = _get_stock(ticker)
+    df = None
+    for days in (5, 10):
+        start, end = _date_range(days)
+        df = stock.quote.history(start=start, end=end)
+        if df is not None and len(df) >= 2:
+            break
+    if df is None or df.empty:
+        raise ValueError(f"No price data for {ticker}")
+
+    # Try to identify column names dynamically
+    close_col = _find_column(df, ["close"])
+    volume_col = _find_column(df, ["volume"])
+
+    if not close_col:
+        raise ValueError(f"No close column in price data for {ticker}")
+
+    # One float64 block for the last two sessions; with a single session
+    # row 0 is also the latest, so prev_close == close
+    cols = [close_col, volume_col] if volume_col else [close_col]
+    last = df[cols].tail(2).to_numpy(np.float64)
+    close = float(last[-1, 0])
+    prev_close = float(last[0, 0])
+    volume = int(last[-1, 1]) if volume_col else 0
+    return close, prev_close, volume
+
+
+_MA_NAMES = ("MA20", "MA50", "MA200")
+
+
 def calculate_technical_indicators(df: pd.DataFrame) -> dict[str, Any]:
     """Compute MA50, MA200, RSI-14 from an OHLCV DataFrame.
 
@@ -212,20 +306,18 @@ def calculate_technical_indicators(df: pd.DataFrame) -> dict[str, Any]:
         return {"error": "Cannot find 'close' column in DataFrame"}
 
     close = df[close_col].astype(float)
-
-    # Moving Averages
-    ma20 = close.rolling(20).mean()
-    ma50 = close.rolling(50).mean()
-    ma200 = close.rolling(200).mean()
+    arr = close.to_numpy()
 
     # RSI-14
     rsi = _compute_rsi(close, period=14)
 
-    latest_close = close.iloc[-1]
-    latest_ma50 = ma50.iloc[-1] if not np.isnan(ma50.iloc[-1]) else 0
-    latest_ma200 = ma200.iloc[-1] if not np.isnan(ma200.iloc[-1]) else 0
-    latest_ma20 = ma20.iloc[-1] if not np.isnan(ma20.iloc[-1]) else 0
-    latest_rsi = rsi.iloc[-1] if not np.isnan(rsi.iloc[-1]) else 50
+    latest_close = arr[-1]
+    # Moving Averages – only the latest value of each is used, so every MA
+    # is the mean of its last window (no full-length series)
+    latest_ma20 = _tail_mean(arr, 20)
+    latest_ma50 = _tail_mean(arr, 50)
+    latest_ma200 = _tail_mean(arr, 200)
+    latest_rsi = rsi[-1] if rsi.size and not np.isnan(rsi[-1]) else 50
 
     # Trend determination
     if latest_ma50 > latest_ma200 and latest_close > latest_ma50:
@@ -236,21 +328,20 @@ def calculate_technical_indicators(df: pd.DataFrame) -> dict[str, Any]:
         trend = "SIDEWAYS"
 
     # MA alignment description
-    ma_parts = []
-    if latest_ma20:
-        ma_parts.append(f"MA20={latest_ma20:,.0f}")
-    if latest_ma50:
-        ma_parts.append(f"MA50={latest_ma50:,.0f}")
-    if latest_ma200:
-        ma_parts.append(f"MA200={latest_ma200:,.0f}")
-    ma_alignment = " > ".join(ma_parts) if ma_parts else "N/A"
+    ma_vals = np.array([latest_ma20, latest_ma50, latest_ma200], dtype=np.float64)
+    ma_mask = ~np.isnan(ma_vals) & (ma_vals != 0)
+    ma_alignment = " > ".join(
+        f"{name}={val:,.0f}" for name, val, ok in zip(_MA_NAMES, ma_vals.tolist(), ma_mask.tolist()) if ok
+    ) or "N/A"
 
     # Simple support / resistance from recent lows / highs
-    recent = df.tail(60)
     low_col = _find_column(df, ["low"])
     high_col = _find_column(df, ["high"])
-    support = f"{recent[low_col].min():,.0f}" if low_col else "N/A"
-    resistance = f"{recent[high_col].max():,.0f}" if high_col else "N/A"
+    # One float64 block: low is column 0, high the last column
+    cols = [col for col in (low_col, high_col) if col]
+    recent = df[cols].tail(60).to_numpy(np.float64) if cols else None
+    support = f"{np.nanmin(recent[:, 0]):,.0f}" if low_col else "N/A"
+    resistance = f"{np.nanmax(recent[:, -1]):,.0f}" if high_col else "N/A"
 
     return {
         "trend": trend,
@@ -267,28 +358,58 @@ def calculate_technical_indicators(df: pd.DataFrame) -> dict[str, Any]:
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
 
-def _find_column(df: pd.DataFrame, keywords: list[str]) -> str | None:
-    """Find the first column name containing any of the keywords (case-insensitive)."""
-    for col in df.columns:
-        for kw in keywords:
-            if kw.lower() in str(col).lower():
-                return col
-    return None
+def _date_range(days: int, today: date | None = None) -> tuple[str, str]:
+    """``(start, end)`` ISO dates covering the last ``days`` calendar days.
 
+    Days are Vietnam dates (not the server's), like the price cache key.
+    """
+    today = today or datetime.now(_VN_TZ).date()
+    return (today - timedelta(days=days)).isoformat(), today.isoformat()
+
+
+def _project_columns(df: pd.DataFrame, keywords: tuple[str, ...]) -> pd.DataFrame:
+    """Columns of ``df`` whose label contains any keyword (order preserved)."""
+    keep = [col for col_lower, col in _col_index(df) if any(kw in col_lower for kw in keywords)]
+    return df[keep]
+
+
+def _col_index(df: pd.DataFrame) -> list[tuple[str, Any]]:
+    """``(lowered name, original label)`` of every column, lowered once."""
+    return [(str(col).lower(), col) for col in df.columns]
+
+
+def _match_column(
+    idx: list[tuple[str, Any]], keywords: list[str], exclude: list[str] | None = None
+) -> Any | None:
+    """First column of a ``_col_index`` matching any keyword and no exclude pattern."""
+    pos = _match_position(
+        tuple(col_lower for col_lower, _ in idx),
+        tuple(kw.lower() for kw in keywords),
+        tuple(ex.lower() for ex in exclude or ()),
+    )
+    return idx[pos][1] if pos is not None else None
+
+
+@lru_cache(maxsize=256)
+def _match_position(
+    columns: tuple[str, ...], keywords: tuple[str, ...], exclude: tuple[str, ...]
+) -> int | None:
+    """Position of the first matching lowered column name.
 
-def _find_column_exclude(
-    df: pd.DataFrame, keywords: list[str], exclude: list[str] | None = None
-) -> str | None:
-    """Find a column matching keywords but NOT containing any exclude patterns."""
-    exclude = exclude or []
-    for col in df.columns:
-        col_str = str(col).lower()
-        if any(kw.lower() in col_str for kw in keywords):
-            if not any(ex.lower() in col_str for ex in exclude):
-                return col
+    Memoised: vnstock frames share one schema across tickers, so after the
+    first call every lookup is a hash hit.
+    """
+    for pos, col_lower in enumerate(columns):
+        if any(kw in col_lower for kw in keywords) and not any(ex in col_lower for ex in exclude):
+            return pos
     return None
 
 
+def _find_column(df: pd.DataFrame, keywords: list[str]) -> str | None:
+    """Find the first column name containing any of the keywords (case-insensitive)."""
+    return _match_column(_col_index(df), keywords)
+
+
 def _safe_growth(current: float, previous: float) -> float:
     """Calculate growth % safely."""
     try:
@@ -299,15 +420,42 @@ def _safe_growth(current: float, previous: float) -> float:
     return 0.0
 
 
-def _compute_rsi(series: pd.Series, period: int = 14) -> pd.Series:
-    """Compute RSI from a price series."""
-    delta = series.diff()
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
+def _tail_mean(arr: np.ndarray, window: int) -> float:
+    """Mean of the last ``window`` values (latest SMA); 0 if too short or NaN."""
+    if arr.size < window:
+        return 0
+    value = arr[-window:].mean()
+    return value if not np.isnan(value) else 0
 
-    avg_gain = gain.rolling(window=period, min_periods=period).mean()
-    avg_loss = loss.rolling(window=period, min_periods=period).mean()
 
-    rs = avg_gain / avg_loss.replace(0, np.nan)
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+def _compute_rsi(series: pd.Series, period: int = 14) -> np.ndarray:
+    """Compute Wilder's RSI from a price series (NaN for the first ``period`` bars)."""
+    return _rsi_wilder(series.to_numpy(dtype=np.float64), period)
+
+
+@njit(cache=True)
+def _rsi_wilder(close: np.ndarray, period: int) -> np.ndarray:
+    """Single pass: SMA seed over the first ``period`` deltas, then Wilder smoothing."""
+    n = close.size
+    out = np.full(n, np.nan)
+    if n <= period:
+        return out
+
+    gain = 0.0
+    loss = 0.0
+    for i in range(1, period + 1):
+        d = close[i] - close[i - 1]
+        if d > 0:
+            gain += d
+        else:
+            loss -= d
+    avg_gain = gain / period
+    avg_loss = loss / period
+    out[period] = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    for i in range(period + 1, n):
+        d = close[i] - close[i - 1]
+        avg_gain = (avg_gain * (period - 1) + (d if d > 0 else 0.0)) / period
+        avg_loss = (avg_loss * (period - 1) + (-d if d < 0 else 0.0)) / period
+        out[i] = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
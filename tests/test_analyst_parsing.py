@@ -0,0 +1,87 @@
+"""Unit tests for turning the analyst's answer into state updates.
+
+Run:
+    python -m pytest tests/test_analyst_parsing.py -v
+"""
+
+from __future__ import annotations
+
+import json
+
+from agents.nodes import _analyst_result_from_dict, _empty_analyst_result, _parse_analyst_response
+
+_PAYLOAD = {
+    "financial_analysis": {
+        "revenue_growth": 12.5, "profit_growth": 8.0, "roe": 21.0,
+        "pe_ratio": 14.2, "debt_to_equity": 0.4, "is_healthy": True,
+    },
+    "technical_signals": {
+        "trend": "UP", "rsi": 61.0, "ma_alignment": "MA20 > MA50",
+        "support_zone": "95,000", "resistance_zone": "110,000",
+    },
+}
+_JSON = json.dumps(_PAYLOAD)
+
+
+def _roe(result: dict) -> float | None:
+    fa = result["financial_analysis"]  # sanitized: a plain dict
+    return fa["roe"] if fa is not None else None
+
+
+class TestParseAnalystResponse:
+    """Fence preference: ```json first, then any fence, then the bare text."""
+
+    def test_json_fence_wins_over_earlier_plain_fence(self):
+        content = f"Ví dụ:\n```python\nprint('x')\n```\nKết quả:\n```json\n{_JSON}\n```"
+        assert _roe(_parse_analyst_response(content, "FPT")) == 21.0
+
+    def test_json_fence_tag_is_case_insensitive(self):
+        content = f"```JSON\n{_JSON}\n```"
+        assert _roe(_parse_analyst_response(content, "FPT")) == 21.0
+
+    def test_untagged_fence(self):
+        content = f"Kết quả:\n```\n{_JSON}\n```\n"
+        assert _roe(_parse_analyst_response(content, "FPT")) == 21.0
+
+    def test_bare_json(self):
+        assert _roe(_parse_analyst_response(f"  {_JSON}\n", "FPT")) == 21.0
+
+    def test_no_json_falls_back_to_empty(self):
+        content = "Xin lỗi, tôi không thể phân tích mã này."
+        assert _parse_analyst_response(content, "FPT") == _empty_analyst_result()
+
+    def test_fence_without_json_falls_back_to_empty(self):
+        content = "```\nkhông phải JSON\n```"
+        assert _parse_analyst_response(content, "FPT") == _empty_analyst_result()
+
+
+class TestAnalystResultFromDict:
+    """A malformed ``emit_analysis`` payload degrades per section, never raises."""
+
+    def test_missing_fields_take_defaults(self):
+        result = _analyst_result_from_dict({"financial_analysis": {"roe": 21.0}})
+        assert result["financial_analysis"]["roe"] == 21.0
+        assert result["financial_analysis"]["pe_ratio"] == 0
+        assert result["technical_signals"]["trend"] == "SIDEWAYS"
+        assert result["smc_analysis"] is None
+
+    def test_wrong_typed_field_drops_only_its_section(self):
+        result = _analyst_result_from_dict({
+            "financial_analysis": {**_PAYLOAD["financial_analysis"], "roe": "cao"},
+            "technical_signals": {"trend": "UP", "rsi": "61.5", "support_zone": None},
+            "smc_analysis": "bullish",
+            "wyckoff_analysis": {"phase": "C"},
+        })
+        assert result["financial_analysis"] is None
+        assert result["technical_signals"]["rsi"] == 61.5
+        assert result["technical_signals"]["support_zone"] == "N/A"
+        assert result["smc_analysis"] is None
+        assert result["wyckoff_analysis"] == {"phase": "C"}
+
+    def test_non_object_section_is_none(self):
+        result = _analyst_result_from_dict({"technical_signals": "UP"})
+        assert result["technical_signals"] is None
+        assert result["financial_analysis"] is not None
+
+    def test_non_object_payload_is_empty_result(self):
+        assert _analyst_result_from_dict(["UP", 61]) == _empty_analyst_result()
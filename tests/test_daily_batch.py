@@ -0,0 +1,98 @@
+"""Unit tests for the daily follow-up decision rules (``DailyBatch``).
+
+``decide`` must give the same answer as the per-symbol if/elif chain it
+replaced, including unset (0 / None) levels and prices exactly on a level,
+and the numba-compiled kernel the same as its pure-Python source.
+
+Run:
+    python -m pytest tests/test_daily_batch.py -v
+"""
+
+from __future__ import annotations
+
+import itertools
+
+import numpy as np
+
+from models.state import DailyBatch, _classify
+from worker import _level
+
+# Raw levels as stored on a thesis / scenario (0 and None mean "unset")
+_LEVELS = [None, 0, 90.0, 100.0, 110.0, float("inf")]
+_CLOSES = [90.0, 100.0, 110.0]
+
+
+def _reference(close, stop, entry_min, entry_max, target) -> int:
+    """The original per-symbol chain from worker.py."""
+    if stop and close <= stop:
+        return DailyBatch.HIT_STOP
+    elif entry_min and entry_max and entry_min <= close <= entry_max:
+        return DailyBatch.IN_ENTRY
+    elif target and close >= target:
+        return DailyBatch.ABOVE_TARGET
+    return DailyBatch.HOLD
+
+
+def _cases() -> list[tuple]:
+    return list(itertools.product(_CLOSES, _LEVELS, _LEVELS, _LEVELS, _LEVELS))
+
+
+def _batch(cases: list[tuple]) -> DailyBatch:
+    return DailyBatch.from_rows([
+        {
+            "symbol": f"S{i}", "close": close, "volume": 0.0, "change_pct": 0.0,
+            "stop": _level(stop), "entry_min": _level(entry_min),
+            "entry_max": _level(entry_max), "target": _level(target),
+        }
+        for i, (close, stop, entry_min, entry_max, target) in enumerate(cases)
+    ])
+
+
+class TestDecide:
+    """``decide`` vs the old if/elif chain."""
+
+    def test_matches_reference_chain(self):
+        cases = _cases()
+        expected = [_reference(*case) for case in cases]
+        assert _batch(cases).decide().tolist() == expected
+
+    def test_unset_levels_never_fire(self):
+        decisions = _batch([(100.0, None, 0, None, 0), (100.0, 0, None, 0, None)]).decide()
+        assert decisions.tolist() == [DailyBatch.HOLD, DailyBatch.HOLD]
+
+    def test_price_on_a_level_fires(self):
+        decisions = _batch([
+            (100.0, 100.0, None, None, None),   # close == stop
+            (100.0, None, 100.0, 100.0, None),  # close == both entry bounds
+            (100.0, None, None, None, 100.0),   # close == target
+        ]).decide()
+        assert decisions.tolist() == [DailyBatch.HIT_STOP, DailyBatch.IN_ENTRY, DailyBatch.ABOVE_TARGET]
+
+    def test_priority_stop_then_entry_then_target(self):
+        decisions = _batch([
+            (100.0, 110.0, 90.0, 110.0, 90.0),  # all three match → stop
+            (100.0, 90.0, 90.0, 110.0, 90.0),   # entry and target → entry
+        ]).decide()
+        assert decisions.tolist() == [DailyBatch.HIT_STOP, DailyBatch.IN_ENTRY]
+
+    def test_empty_batch(self):
+        assert _batch([]).decide().dtype == np.int8
+        assert len(_batch([]).decide()) == 0
+
+
+class TestKernel:
+    """``warm_up`` compiles ``_classify``; compiled and Python agree."""
+
+    def test_warm_up_compiles(self):
+        DailyBatch.warm_up()
+        assert _classify.signatures
+
+    def test_compiled_matches_python(self):
+        DailyBatch.warm_up()
+        b = _batch(_cases())
+        args = (b.close, b.stop, b.entry_min, b.entry_max, b.target)
+        compiled = np.empty(len(b.symbols), dtype=np.int8)
+        python = np.empty(len(b.symbols), dtype=np.int8)
+        _classify(*args, compiled)
+        _classify.py_func(*args, python)
+        assert compiled.tolist() == python.tolist()
@@ -0,0 +1,80 @@
+"""Unit tests for the daily follow-up job's snapshot writes.
+
+Run:
+    python -m pytest tests/test_daily_job.py -v
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+import worker
+from database import crud
+
+
+class _FakeTable:
+    def __init__(self, calls: list):
+        self._calls = calls
+
+    def upsert(self, data, on_conflict=None):
+        self._calls.append((data, on_conflict))
+        return self
+
+    def execute(self):
+        return type("Result", (), {"data": self._calls[-1][0]})()
+
+
+class _FakeSupabase:
+    def __init__(self):
+        self.calls: list = []
+
+    def table(self, name):
+        return _FakeTable(self.calls)
+
+
+class TestInsertSnapshotsBulk:
+    """One upsert may not touch the same (symbol, date) row twice."""
+
+    def test_duplicate_symbol_date_collapses_to_last(self, monkeypatch):
+        db = _FakeSupabase()
+        monkeypatch.setattr(crud, "get_supabase", lambda: db)
+        day = date(2026, 10, 14)
+        rows = [
+            {"symbol": "fpt", "close_price": 1.0, "volume": 1, "change_percent": 0.0, "snapshot_date": day},
+            {"symbol": "VNM", "close_price": 2.0, "volume": 2, "change_percent": 0.0, "snapshot_date": day},
+            {"symbol": "FPT", "close_price": 3.0, "volume": 3, "change_percent": 0.0, "snapshot_date": day},
+        ]
+        crud.insert_snapshots_bulk(rows)
+
+        (data, on_conflict), = db.calls
+        assert on_conflict == "symbol,date"
+        assert [(r["symbol"], r["close_price"]) for r in data] == [("FPT", 3.0), ("VNM", 2.0)]
+
+
+class TestDailyFollowupJob:
+    """A symbol on the watchlist twice is followed up (and saved) once."""
+
+    def test_duplicate_watchlist_symbol(self, monkeypatch):
+        saved: list[list[dict]] = []
+        sent: list[str] = []
+
+        async def no_commentary(llm, rows):
+            return [""] * len(rows)
+
+        monkeypatch.setattr(crud, "get_active_watchlist", lambda: [
+            {"symbol": "FPT"}, {"symbol": "VNM"}, {"symbol": "FPT"},
+        ])
+        monkeypatch.setattr(crud, "get_latest_theses_bulk", lambda symbols: {s: None for s in symbols})
+        monkeypatch.setattr(crud, "insert_snapshots_bulk", saved.append)
+        monkeypatch.setattr(worker.vnstock_service, "get_current_price", lambda symbol: {
+            "close": 100_000.0, "volume": 1_000, "change_percent": 1.5,
+        })
+        monkeypatch.setattr(worker, "_get_commentary_llm", lambda: None)
+        monkeypatch.setattr(worker, "_gather_commentary", no_commentary)
+        monkeypatch.setattr(worker, "send_message_sync", sent.append)
+
+        worker.daily_followup_job()
+
+        (snapshots,) = saved
+        assert [s["symbol"] for s in snapshots] == ["FPT", "VNM"]
+        assert sent[0].count("*FPT*") == 1
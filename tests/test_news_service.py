@@ -0,0 +1,90 @@
+"""Unit tests for news headline filtering and result caching.
+
+Run:
+    python -m pytest tests/test_news_service.py -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from cachetools import TTLCache
+
+from services import news_service
+from services.news_service import _filter_headlines
+
+
+def _titles(*titles: str) -> list[tuple[str, str]]:
+    return [(title, "") for title in titles]
+
+
+class TestFilterHeadlines:
+    """Whole-word ticker match, ignoring case and diacritics."""
+
+    def test_substring_of_another_word_does_not_match(self):
+        items = _titles("SSIAM ra mắt quỹ mới", "Việc làm tăng mạnh", "PVIC báo lãi")
+        assert _filter_headlines(items, "SSI", 5) == []
+        assert _filter_headlines(items, "VIC", 5) == []
+
+    def test_whole_word_with_punctuation(self):
+        items = _titles("Thép (HPG), HSG cùng tăng", "Khối ngoại mua ròng HPG.")
+        assert _filter_headlines(items, "HPG", 5) == [t for t, _ in items]
+
+    def test_ignores_case(self):
+        assert _filter_headlines(_titles("fpt lập đỉnh mới"), "FPT", 5) == ["fpt lập đỉnh mới"]
+        assert _filter_headlines(_titles("FPT lập đỉnh mới"), "fpt", 5) == ["FPT lập đỉnh mới"]
+
+    def test_ignores_diacritics(self):
+        items = _titles("Dược Hậu Giang (ĐHG) báo lãi quý III")
+        assert _filter_headlines(items, "DHG", 5) == ["Dược Hậu Giang (ĐHG) báo lãi quý III"]
+
+    def test_matches_description(self):
+        items = [("Nhóm công nghệ dẫn dắt", "Trong đó FPT tăng 3%")]
+        assert _filter_headlines(items, "FPT", 5) == ["Nhóm công nghệ dẫn dắt"]
+
+    def test_unique_and_limited(self):
+        items = _titles("VNM tăng", "VNM tăng", "VNM giảm", "VNM đi ngang")
+        assert _filter_headlines(items, "VNM", 2) == ["VNM tăng", "VNM giảm"]
+
+
+class TestNegativeCache:
+    """An empty result is cached (shorter TTL) and not re-fetched meanwhile."""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        now = [0.0]
+
+        def timer() -> float:
+            return now[0]
+
+        monkeypatch.setattr(news_service, "_result_cache", TTLCache(maxsize=8, ttl=600, timer=timer))
+        monkeypatch.setattr(news_service, "_miss_cache", TTLCache(maxsize=8, ttl=60, timer=timer))
+        return now
+
+    @pytest.fixture
+    def fetches(self, monkeypatch):
+        calls: list[str] = []
+
+        async def fake_fetch(url):
+            calls.append(url)
+            return [("Thị trường đi ngang", "")]
+
+        monkeypatch.setattr(news_service, "_fetch_feed", fake_fetch)
+        return calls
+
+    def test_empty_result_is_cached_within_ttl(self, clock, fetches):
+        first = asyncio.run(news_service.search_news("FPT"))
+        assert first == ["Không tìm thấy tin tức mới cho FPT."]
+        assert len(fetches) == len(news_service._FEEDS)
+
+        clock[0] = 59.0
+        assert asyncio.run(news_service.search_news("fpt")) == first
+        assert len(fetches) == len(news_service._FEEDS)
+        assert ("FPT", 5) not in news_service._result_cache
+
+    def test_empty_result_expires_after_ttl(self, clock, fetches):
+        asyncio.run(news_service.search_news("FPT"))
+        clock[0] = 61.0
+        asyncio.run(news_service.search_news("FPT"))
+        assert len(fetches) == 2 * len(news_service._FEEDS)
@@ -0,0 +1,75 @@
+"""Unit tests for Telegram message splitting.
+
+Run:
+    python -m pytest tests/test_telegram_split.py -v
+"""
+
+from __future__ import annotations
+
+from services.telegram_service import _split_message
+
+
+class TestSplitMessage:
+    """_split_message must respect the limit and lose nothing but cut newlines."""
+
+    def test_short_text_single_chunk(self):
+        assert _split_message("hello", max_len=10) == ["hello"]
+
+    def test_splits_at_last_newline(self):
+        text = "aaaa\nbbbb\ncccc"
+        assert _split_message(text, max_len=10) == ["aaaa\nbbbb", "cccc"]
+
+    def test_hard_cut_without_newline(self):
+        text = "x" * 25
+        assert _split_message(text, max_len=10) == ["x" * 10, "x" * 10, "x" * 5]
+
+    def test_newlines_at_cut_are_dropped(self):
+        text = "a" * 8 + "\n\n\n" + "b" * 8
+        assert _split_message(text, max_len=9) == ["a" * 8, "b" * 8]
+
+    def test_no_empty_chunks(self):
+        text = "\n" + "y" * 30
+        chunks = _split_message(text, max_len=10)
+        assert all(chunks)
+        assert "".join(chunks) == text
+
+    def test_chunks_within_limit(self):
+        lines = [f"line {i} " + "z" * (i % 17) for i in range(500)]
+        text = "\n".join(lines)
+        chunks = _split_message(text, max_len=400)
+        assert all(0 < len(c) <= 400 for c in chunks)
+        assert "".join(chunks).replace("\n", "") == text.replace("\n", "")
+
+
+class TestSplitVietnamese:
+    """Telegram's 4096 limit counts characters (UTF-16 units), not UTF-8 bytes.
+
+    Vietnamese letters are 2–3 bytes each in UTF-8, so a byte-based split
+    would cut a near-limit report far too early – or mid-character.
+    """
+
+    _SENTENCE = "Cổ phiếu ngành thép phục hồi, khối ngoại mua ròng mạnh phiên hôm nay. "
+
+    @staticmethod
+    def _utf16_len(text: str) -> int:
+        return len(text.encode("utf-16-le")) // 2
+
+    def test_exactly_at_limit_is_one_chunk(self):
+        text = (self._SENTENCE * 60)[:4000]
+        assert len(text.encode("utf-8")) > 4096
+        assert _split_message(text, max_len=4000) == [text]
+
+    def test_one_past_limit_splits(self):
+        text = (self._SENTENCE * 60)[:4001]
+        chunks = _split_message(text, max_len=4000)
+        assert [len(c) for c in chunks] == [4000, 1]
+        assert "".join(chunks) == text
+
+    def test_long_report_chunks_fit_telegram(self):
+        lines = [f"├ Kịch bản {i}: {self._SENTENCE * (i % 4 + 1)}" for i in range(200)]
+        text = "📊 *Báo cáo phân tích: HPG*\n" + "\n".join(lines)
+        chunks = _split_message(text, max_len=4000)
+        assert len(chunks) > 1
+        assert all(self._utf16_len(c) <= 4096 for c in chunks)
+        # Whole characters only: nothing lost but the newlines at the cuts
+        assert "".join(chunks).replace("\n", "") == text.replace("\n", "")
@@ -0,0 +1,135 @@
+"""Async tests for streaming a report to Telegram.
+
+A fake ``httpx`` transport stands in for the Bot API, so every
+sendMessage / editMessageText call is recorded instead of sent.
+
+Run:
+    python -m pytest tests/test_telegram_stream.py -v
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+import main
+from services import telegram_service
+from services.telegram_service import RateLimiter, stream_report
+
+
+class _FakeBotAPI:
+    """Records Bot API calls; sendMessage returns increasing message_ids."""
+
+    def __init__(self, fail_send: bool = False):
+        self.calls: list[tuple[str, dict]] = []
+        self._fail_send = fail_send
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        method = request.url.path.rsplit("/", 1)[-1]
+        payload = orjson.loads(request.content)
+        self.calls.append((method, payload))
+        if method == "sendMessage":
+            if self._fail_send:
+                return httpx.Response(500, json={"ok": False})
+            return httpx.Response(200, json={"ok": True, "result": {"message_id": len(self.calls)}})
+        return httpx.Response(200, json={"ok": True, "result": True})
+
+    def methods(self) -> list[str]:
+        return [method for method, _ in self.calls]
+
+
+class _CountingLimiter(RateLimiter):
+    def __init__(self):
+        super().__init__(0.0)
+        self.waits = 0
+
+    async def wait(self) -> None:
+        self.waits += 1
+        await super().wait()
+
+
+@pytest.fixture
+def bot(monkeypatch):
+    api = _FakeBotAPI()
+    monkeypatch.setattr(telegram_service, "_ENABLED", True)
+    monkeypatch.setattr(telegram_service, "_EDIT_INTERVAL_S", 0.0)  # flush on every delta
+    monkeypatch.setattr(
+        telegram_service, "get_http",
+        lambda: httpx.AsyncClient(transport=httpx.MockTransport(api)),
+    )
+    return api
+
+
+def _stream(deltas: list[str], limiter: RateLimiter) -> str:
+    """Run ``stream_report`` over ``deltas`` followed by the end sentinel."""
+    async def run() -> str:
+        queue: asyncio.Queue = asyncio.Queue()
+        for delta in [*deltas, None]:
+            queue.put_nowait(delta)
+        return await stream_report("FPT", queue, limiter)
+
+    return asyncio.run(run())
+
+
+class TestStreamReport:
+    def test_edits_in_place_and_finishes_in_markdown(self, bot):
+        shown = _stream(["Xu hướng ", "tăng."], _CountingLimiter())
+
+        assert shown == "Xu hướng tăng."
+        assert bot.methods() == ["sendMessage", "editMessageText", "editMessageText"]
+        final = bot.calls[-1][1]
+        assert final["parse_mode"] == "Markdown"
+        assert final["text"].endswith("Xu hướng tăng.")
+
+    def test_every_call_waits_on_the_limiter(self, bot):
+        limiter = _CountingLimiter()
+        _stream(["a", "b", "c"], limiter)
+        assert limiter.waits == len(bot.calls)
+
+    def test_rolls_over_past_the_message_limit(self, bot):
+        deltas = ["dòng phân tích\n" * 200, "kết luận\n" * 300]
+        shown = _stream(deltas, _CountingLimiter())
+
+        assert shown == "".join(deltas)
+        sends = [payload for method, payload in bot.calls if method == "sendMessage"]
+        assert len(sends) == 2
+        assert all(len(payload["text"]) <= 4000 for _, payload in bot.calls)
+
+    def test_failed_send_reports_nothing_shown(self, monkeypatch):
+        api = _FakeBotAPI(fail_send=True)
+        monkeypatch.setattr(telegram_service, "_ENABLED", True)
+        monkeypatch.setattr(
+            telegram_service, "get_http",
+            lambda: httpx.AsyncClient(transport=httpx.MockTransport(api)),
+        )
+        assert _stream(["Xu hướng tăng."], _CountingLimiter()) == ""
+
+
+class TestFinishReport:
+    """``_finish_report`` queues the final report unless the stream showed it."""
+
+    def _finish(self, deltas: list[str], report: str) -> list[tuple[str, str]]:
+        async def run() -> list[tuple[str, str]]:
+            main.app.state.tg_queue = asyncio.Queue()
+            queue: asyncio.Queue = asyncio.Queue()
+            task = asyncio.create_task(stream_report("FPT", queue, _CountingLimiter()))
+            for delta in [*deltas, None]:  # the strategist ends the stream early
+                queue.put_nowait(delta)
+            await main._finish_report("FPT", report, task)
+            tg_queue = main.app.state.tg_queue
+            return [tg_queue.get_nowait() for _ in range(tg_queue.qsize())]
+
+        return asyncio.run(run())
+
+    def test_complete_stream_sends_nothing_more(self, bot):
+        assert self._finish(["Báo cáo ", "đầy đủ.\n"], "Báo cáo đầy đủ.") == []
+
+    def test_cut_short_stream_sends_the_final_report(self, bot):
+        error = "❌ Lỗi khi phân tích FPT: timeout"
+        assert self._finish(["Báo cáo dở "], error) == [("FPT", error)]
+
+    def test_nothing_streamed_sends_the_report(self, bot):
+        assert self._finish([], "Báo cáo đầy đủ.") == [("FPT", "Báo cáo đầy đủ.")]
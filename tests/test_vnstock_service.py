@@ -0,0 +1,115 @@
+"""Unit tests for vnstock_service's pure helpers.
+
+Run:
+    python -m pytest tests/test_vnstock_service.py -v
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.vnstock_service import (
+    _PRICE_TTL_OPEN_S,
+    _VN_TZ,
+    _compute_rsi,
+    _date_range,
+    _price_cache_ttl,
+    _rsi_wilder,
+)
+
+# Wilder's 14-day example series (as used in StockCharts' RSI walkthrough)
+_CLOSES = [
+    44.34, 44.09, 44.15, 43.61, 44.33, 44.83, 45.10, 45.42, 45.84, 46.08,
+    45.89, 46.03, 45.61, 46.28, 46.28, 46.00, 46.03, 46.41, 46.22, 45.64,
+    46.21, 46.25, 45.71, 46.45, 45.78, 45.35, 44.03, 44.18, 44.22, 44.57,
+    43.42, 42.66, 43.13,
+]
+
+
+def _reference_rsi(close: list[float], period: int = 14) -> list[float]:
+    """Textbook Wilder RSI: SMA seed over ``period`` deltas, then smoothing."""
+    n = len(close)
+    out = [math.nan] * n
+    if n <= period:
+        return out
+    deltas = [close[i] - close[i - 1] for i in range(1, n)]
+    gain = sum(max(d, 0.0) for d in deltas[:period]) / period
+    loss = sum(max(-d, 0.0) for d in deltas[:period]) / period
+
+    def rsi(g: float, l: float) -> float:
+        return 100.0 if l == 0 else 100.0 - 100.0 / (1.0 + g / l)
+
+    out[period] = rsi(gain, loss)
+    for i in range(period + 1, n):
+        d = deltas[i - 1]
+        gain = (gain * (period - 1) + max(d, 0.0)) / period
+        loss = (loss * (period - 1) + max(-d, 0.0)) / period
+        out[i] = rsi(gain, loss)
+    return out
+
+
+class TestWilderRSI:
+    """``_compute_rsi`` vs a reference Wilder RSI."""
+
+    def test_matches_reference(self):
+        rsi = _compute_rsi(pd.Series(_CLOSES), period=14)
+        assert isinstance(rsi, np.ndarray)
+        expected = _reference_rsi(_CLOSES)
+        assert np.isnan(rsi[:14]).all()
+        assert rsi[14:].tolist() == pytest.approx(expected[14:], abs=1e-9)
+        # Wilder / StockCharts: first RSI ≈ 70.5
+        assert rsi[14] == pytest.approx(70.5, abs=0.1)
+
+    def test_no_losses_is_100(self):
+        rising = np.arange(1.0, 31.0)
+        rsi = _rsi_wilder(rising, 14)
+        assert np.isnan(rsi[:14]).all()
+        assert (rsi[14:] == 100.0).all()
+
+    @pytest.mark.parametrize("n", [0, 1, 14])
+    def test_too_short_is_all_nan(self, n):
+        rsi = _rsi_wilder(np.linspace(10.0, 20.0, n), 14)
+        assert rsi.shape == (n,)
+        assert np.isnan(rsi).all()
+
+
+def _vn(*args) -> datetime:
+    return datetime(*args, tzinfo=_VN_TZ)
+
+
+class TestPriceCacheTTL:
+    """Off-hours price entries live until the next session opens."""
+
+    # 2026-10-14 is a Wednesday
+    @pytest.mark.parametrize("now", [_vn(2026, 10, 14, 9, 0), _vn(2026, 10, 14, 14, 59)])
+    def test_in_session(self, now):
+        assert _price_cache_ttl(now) == _PRICE_TTL_OPEN_S
+
+    def test_before_open(self):
+        assert _price_cache_ttl(_vn(2026, 10, 14, 8, 30)) == 30 * 60
+
+    def test_after_close(self):
+        assert _price_cache_ttl(_vn(2026, 10, 14, 15, 0)) == 18 * 3600
+
+    def test_friday_evening_waits_for_monday(self):
+        assert _price_cache_ttl(_vn(2026, 10, 16, 16, 0)) == (2 * 24 + 17) * 3600
+
+    def test_weekend(self):
+        assert _price_cache_ttl(_vn(2026, 10, 17, 10, 0)) == (24 + 23) * 3600
+
+    def test_never_below_open_ttl(self):
+        assert _price_cache_ttl(_vn(2026, 10, 14, 8, 59, 59)) == _PRICE_TTL_OPEN_S
+
+
+class TestDateRange:
+    def test_explicit_today(self):
+        assert _date_range(5, date(2026, 10, 14)) == ("2026-10-09", "2026-10-14")
+
+    def test_defaults_to_vietnam_date(self):
+        today = datetime.now(_VN_TZ).date()
+        assert _date_range(0) == (today.isoformat(), today.isoformat())
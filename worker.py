@@ -7,9 +7,12 @@ Usage:
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import math
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from apscheduler.schedulers.blocking import BlockingScheduler
@@ -17,8 +20,9 @@ from apscheduler.triggers.cron import CronTrigger
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from config import get_settings
+from config import settings
 from database import crud
+from models.state import DailyBatch
 from prompts.system_prompts import DAILY_FOLLOWUP_PROMPT
 from services import vnstock_service
 from services.telegram_service import send_message_sync
@@ -29,6 +33,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Symbols loaded concurrently (vnstock calls are I/O-bound)
+_MAX_WORKERS = 8
+
+# Claude commentary requests in flight at once (API rate limits)
+_COMMENTARY_CONCURRENCY = 5
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Core job logic
@@ -52,44 +62,110 @@ def daily_followup_job() -> None:
         return
 
     all_reports: list[str] = []
-    settings = get_settings()
+    snapshots: list[dict] = []
 
-    for item in watchlist:
-        symbol = item["symbol"]
-        logger.info("📌 Processing %s …", symbol)
+    # 1. Latest thesis of every symbol in one request (a symbol can be on
+    #    the watchlist twice – follow it up once)
+    symbols = list(dict.fromkeys(item["symbol"] for item in watchlist))
+    try:
+        theses = crud.get_latest_theses_bulk(symbols)
+    except Exception as exc:
+        logger.warning("Bulk thesis fetch failed, falling back per symbol: %s", exc)
+        theses = {}
 
-        try:
-            report = _process_symbol(symbol, settings)
-            all_reports.append(report)
-        except Exception as exc:
-            logger.exception("Failed to process %s", symbol)
-            all_reports.append(f"❌ {symbol}: Lỗi – {exc}")
+    with ThreadPoolExecutor(max_workers=min(_MAX_WORKERS, len(symbols))) as pool:
+        # 2. Load prices & levels (report string on failure), order preserved
+        entries = list(pool.map(lambda symbol: _safe_load(symbol, theses), symbols))
+
+    # 3. Stop / entry / target checks for all symbols at once
+    rows = [entry for entry in entries if isinstance(entry, dict)]
+    decisions = DailyBatch.from_rows(rows).decide().tolist()
+
+    # 4. Claude commentary for every symbol, overlapped on one event loop
+    #    with a single client (and HTTP connection pool)
+    try:
+        comments = asyncio.run(_gather_commentary(_get_commentary_llm(), rows))
+    except Exception as exc:
+        logger.warning("AI commentary disabled for this run: %s", exc)
+        comments = [""] * len(rows)
+
+    # 5. Snapshot & report section per symbol (pure Python)
+    built = iter(map(_safe_build, rows, decisions, comments))
+
+    # Symbols without a snapshot today (no price, or failed), kept apart
+    skipped: list[str] = []
+    for symbol, entry in zip(symbols, entries):
+        if isinstance(entry, str):
+            all_reports.append(entry)
+            skipped.append(symbol)
+            continue
+        report, snapshot = next(built)
+        all_reports.append(report)
+        if snapshot is None:
+            skipped.append(symbol)
+        else:
+            snapshots.append(snapshot)
+
+    # Save all snapshots to DB in a single request
+    try:
+        crud.insert_snapshots_bulk(snapshots)
+    except Exception as exc:
+        logger.warning("Could not save %d snapshots: %s", len(snapshots), exc)
+    if skipped:
+        logger.warning("No snapshot for %d symbols: %s", len(skipped), ", ".join(skipped))
 
     # Combine and send summary
     today = datetime.now().strftime("%d/%m/%Y")
-    header = f"📋 *Daily Watchlist Report — {today}*\n{'─' * 35}\n\n"
-    full_report = header + "\n\n".join(all_reports)
+    header = f"📋 *Daily Watchlist Report — {today}*\n{'─' * 35}"
+    full_report = "\n\n".join([header, *all_reports])
 
     send_message_sync(full_report)
-    logger.info("✅ Daily follow-up completed – %d symbols processed.", len(watchlist))
+    logger.info("✅ Daily follow-up completed – %d/%d symbols processed.", len(snapshots), len(symbols))
+
+
+def _safe_load(symbol: str, theses: dict[str, dict | None]) -> dict | str:
+    """``_load_symbol`` that turns any failure into its report line."""
+    logger.info("📌 Processing %s …", symbol)
+    try:
+        return _load_symbol(symbol, theses)
+    except Exception as exc:
+        logger.exception("Failed to process %s", symbol)
+        return f"❌ {symbol}: Lỗi – {exc}"
 
 
-def _process_symbol(symbol: str, settings) -> str:
-    """Process a single symbol: fetch data, compare thesis & scenarios, generate alert."""
+def _safe_build(row: dict, decision: int, ai_comment: str) -> tuple[str, dict | None]:
+    """``_build_symbol_report`` that turns any failure into its report line."""
+    try:
+        return _build_symbol_report(row, decision, ai_comment)
+    except Exception as exc:
+        logger.exception("Failed to process %s", row["symbol"])
+        return f"❌ {row['symbol']}: Lỗi – {exc}", None
+
+
+def _level(value) -> float:
+    """Price level as float; NaN when unset (0 / None), so it never triggers."""
+    return float(value) if value else math.nan
+
+
+def _load_symbol(symbol: str, theses: dict[str, dict | None]) -> dict | str:
+    """Fetch price, thesis & scenario levels for one symbol.
+
+    ``theses`` is the bulk-fetched ``{SYMBOL: thesis}`` map; symbols missing
+    from it are looked up individually.  Returns a row for ``DailyBatch``
+    (plus context for the report), or the report section directly when the
+    price is unavailable.
+    """
 
     # 1. Get current market data
     price_info = vnstock_service.get_current_price(symbol)
     if "error" in price_info:
         return f"⚠️ *{symbol}*: Không lấy được dữ liệu giá – {price_info['error']}"
 
-    close_price = price_info["close"]
-    volume = price_info["volume"]
-    change_pct = price_info["change_percent"]
-
     # 2. Get stored thesis & scenarios
-    thesis = crud.get_latest_thesis(symbol)
+    key = symbol.upper()
+    thesis = theses[key] if key in theses else crud.get_latest_thesis(symbol)
 
-    # 3. Load and evaluate scenarios
+    # 3. Load scenarios
     scenarios = []
     primary_scenario = None
     primary_label = None
@@ -106,55 +182,84 @@ def _process_symbol(symbol: str, settings) -> str:
                 primary_scenario = s
                 break
 
-    # 4. Scenario-aware decision
-    signal = "HOLD"
-    emoji = "⚪"
-    note = "GIỮ — Kịch bản vẫn hiệu lực, tiếp tục theo dõi."
-    needs_reanalysis = False
-
+    # 4. Levels to check against
+    source = None
+    entry_min = entry_max = target = stop = 0
     if primary_scenario:
         # Use primary scenario's entry/target/stop-loss
+        source = "scenario"
         entry_range = primary_scenario.get("entry_range", [])
         entry_min = entry_range[0] if len(entry_range) > 0 else 0
         entry_max = entry_range[1] if len(entry_range) > 1 else float("inf")
         target = primary_scenario.get("target_price", 0)
         stop = primary_scenario.get("stop_loss", 0)
+    elif thesis:
+        # Fallback: use thesis-level entry/target/stop (backward compat)
+        source = "thesis"
+        stop = thesis.get("stop_loss_price") or 0
+        entry_min = thesis.get("entry_zone_min") or 0
+        entry_max = thesis.get("entry_zone_max") or float("inf")
+        target = thesis.get("target_price") or float("inf")
 
-        # Check invalidation (parse price from invalidation text — fallback to stop)
-        if stop and close_price <= stop:
+    return {
+        "symbol": symbol,
+        "close": price_info["close"],
+        "volume": price_info["volume"],
+        "change_pct": price_info["change_percent"],
+        "target": _level(target),
+        "stop": _level(stop),
+        "entry_min": _level(entry_min),
+        "entry_max": _level(entry_max),
+        "source": source,
+        "thesis": thesis,
+        "scenarios": scenarios,
+        "primary_label": primary_label,
+    }
+
+
+def _build_symbol_report(row: dict, decision: int, ai_comment: str) -> tuple[str, dict]:
+    """Turn a decided row into its report section and snapshot row."""
+    symbol = row["symbol"]
+    close_price = row["close"]
+    volume = row["volume"]
+    change_pct = row["change_pct"]
+    primary_label = row["primary_label"]
+    stop, target = row["stop"], row["target"]
+    entry_min, entry_max = row["entry_min"], row["entry_max"]
+
+    # Scenario-aware decision
+    signal = "HOLD"
+    emoji = "⚪"
+    note = "GIỮ — Kịch bản vẫn hiệu lực, tiếp tục theo dõi."
+    needs_reanalysis = False
+
+    if row["source"] == "scenario":
+        if decision == DailyBatch.HIT_STOP:
             signal = "SELL"
             emoji = "🔴"
             note = f"KỊCH BẢN {primary_label} BỊ PHÁ VỠ — Giá {close_price:,.0f} < stop-loss {stop:,.0f}"
             needs_reanalysis = True
-        elif entry_min and entry_max and entry_min <= close_price <= entry_max:
+        elif decision == DailyBatch.IN_ENTRY:
             signal = "BUY_MORE"
             emoji = "🟢"
             note = f"ĐIỂM MUA THEO KỊCH BẢN {primary_label} — Giá {close_price:,.0f} trong vùng [{entry_min:,.0f} – {entry_max:,.0f}]"
-        elif target and close_price >= target:
+        elif decision == DailyBatch.ABOVE_TARGET:
             signal = "SELL"
             emoji = "🟡"
             note = f"CHỐT LỜI — Giá {close_price:,.0f} đạt target {target:,.0f} (kịch bản {primary_label})"
         else:
-            signal = "HOLD"
-            emoji = "⚪"
             note = f"GIỮ — Kịch bản {primary_label} vẫn hiệu lực."
 
-    elif thesis:
-        # Fallback: use thesis-level entry/target/stop (backward compat)
-        stop_loss = thesis.get("stop_loss_price") or 0
-        entry_min = thesis.get("entry_zone_min") or 0
-        entry_max = thesis.get("entry_zone_max") or float("inf")
-        target = thesis.get("target_price") or float("inf")
-
-        if stop_loss and close_price <= stop_loss:
+    elif row["source"] == "thesis":
+        if decision == DailyBatch.HIT_STOP:
             signal = "SELL"
             emoji = "🔴"
-            note = f"CẮT LỖ — Giá {close_price:,.0f} phá stop-loss {stop_loss:,.0f}"
-        elif entry_min and entry_max and entry_min <= close_price <= entry_max:
+            note = f"CẮT LỖ — Giá {close_price:,.0f} phá stop-loss {stop:,.0f}"
+        elif decision == DailyBatch.IN_ENTRY:
             signal = "BUY_MORE"
             emoji = "🟢"
             note = f"ĐIỂM MUA — Giá {close_price:,.0f} trong entry [{entry_min:,.0f} – {entry_max:,.0f}]"
-        elif target and close_price >= target:
+        elif decision == DailyBatch.ABOVE_TARGET:
             signal = "SELL"
             emoji = "🟡"
             note = f"CHỐT LỜI — Giá {close_price:,.0f} đạt target {target:,.0f}"
@@ -165,45 +270,62 @@ def _process_symbol(symbol: str, settings) -> str:
         signal = "REANALYZE"
         note += " → CẦN PHÂN TÍCH LẠI TOÀN BỘ"
 
-    # 5. AI commentary via Claude (optional, graceful fallback)
-    ai_comment = ""
-    try:
-        ai_comment = _get_ai_commentary(
-            symbol, close_price, change_pct, volume, thesis, scenarios, primary_label, settings
-        )
-    except Exception:
-        logger.warning("AI commentary skipped for %s", symbol)
+    # Snapshot row (saved in bulk by the caller)
+    snapshot = {
+        "symbol": symbol,
+        "close_price": close_price,
+        "volume": volume,
+        "change_percent": change_pct,
+        "ai_commentary": ai_comment or note,
+        "action_signal": signal,
+    }
+
+    # Format report section
+    lines = [
+        f"{emoji} *{symbol}*",
+        f"├ Giá: {close_price:,.0f} ({change_pct:+.2f}%)",
+        f"├ Volume: {volume:,}",
+        f"├ Kịch bản chính: *{primary_label or 'N/A'}*",
+        f"├ Tín hiệu: *{signal}*",
+        f"└ {note}",
+    ]
+    if ai_comment:
+        lines.append(f"💬 _{ai_comment[:200]}_")
 
-    # 6. Save snapshot to DB
-    try:
-        crud.insert_snapshot(
-            symbol=symbol,
-            close_price=close_price,
-            volume=volume,
-            change_percent=change_pct,
-            ai_commentary=ai_comment or note,
-            action_signal=signal,
-        )
-    except Exception:
-        logger.warning("Could not save snapshot for %s", symbol)
-
-    # 7. Format report section
-    report = (
-        f"{emoji} *{symbol}*\n"
-        f"├ Giá: {close_price:,.0f} ({change_pct:+.2f}%)\n"
-        f"├ Volume: {volume:,}\n"
-        f"├ Kịch bản chính: *{primary_label or 'N/A'}*\n"
-        f"├ Tín hiệu: *{signal}*\n"
-        f"└ {note}"
+    return "\n".join(lines), snapshot
+
+
+def _get_commentary_llm() -> ChatAnthropic:
+    """Claude client for the daily commentary (one per job)."""
+    return ChatAnthropic(
+        model=settings.anthropic_model,
+        api_key=settings.anthropic_api_key,
+        max_tokens=500,
+        temperature=0.3,
     )
 
-    if ai_comment:
-        report += f"\n💬 _{ai_comment[:200]}_"
 
-    return report
+async def _gather_commentary(llm: ChatAnthropic, rows: list[dict]) -> list[str]:
+    """AI commentary for every row, in order ("" where it failed)."""
+    sem = asyncio.Semaphore(_COMMENTARY_CONCURRENCY)
 
+    async def _one(row: dict) -> str:
+        async with sem:
+            try:
+                return await _get_ai_commentary(
+                    llm, row["symbol"], row["close"], row["change_pct"], row["volume"],
+                    row["thesis"], row["scenarios"], row["primary_label"],
+                )
+            except Exception:
+                # Optional – the report falls back to the rule-based note
+                logger.warning("AI commentary skipped for %s", row["symbol"])
+                return ""
 
-def _get_ai_commentary(
+    return await asyncio.gather(*(_one(row) for row in rows))
+
+
+async def _get_ai_commentary(
+    llm: ChatAnthropic,
     symbol: str,
     close_price: float,
     change_pct: float,
@@ -211,16 +333,8 @@ def _get_ai_commentary(
     thesis: dict | None,
     scenarios: list | None,
     primary_label: str | None,
-    settings,
 ) -> str:
     """Get a short AI commentary using Claude with scenario context."""
-    llm = ChatAnthropic(
-        model=settings.anthropic_model,
-        api_key=settings.anthropic_api_key,
-        max_tokens=500,
-        temperature=0.3,
-    )
-
     thesis_text = ""
     if thesis:
         thesis_text = (
@@ -254,7 +368,7 @@ def _get_ai_commentary(
         HumanMessage(content=data),
     ]
 
-    response = llm.invoke(messages)
+    response = await llm.ainvoke(messages)
     return response.content.strip()[:300]
 
 
@@ -263,6 +377,7 @@ def _get_ai_commentary(
 # ─────────────────────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
+    DailyBatch.warm_up()
     if "--once" in sys.argv:
         logger.info("Running daily follow-up job once …")
         daily_followup_job()